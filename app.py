@@ -7,8 +7,20 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+import io
+import json
 import os
-from calculations import RPACalculator
+import tempfile
+import zipfile
+from calculations import READINESS_COLUMNS, RPACalculator
+from derivations import (DERIVATIONS, changed_rows, config_version, flatten_config, recompute_derived,
+                         refresh_stale_rows)
+from ranking import RankingIndex
+from scenarios import BASELINE, ScenarioManager
+from shared_components import SharedComponentIndex, apply_reuse_discounts, discounts_active, format_applications
+from reports import generate_reports
+from snapshots import SnapshotStore
+from validation import ProjectValidator
 import config
 
 # Page configuration
@@ -19,8 +31,27 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize calculator
+# Initialize calculator and validator
 calc = RPACalculator()
+validator = ProjectValidator()
+
+
+# Snapshot store keeps the newest reconstructed state between reruns
+@st.cache_resource
+def get_snapshot_store():
+    return SnapshotStore()
+
+
+snapshot_store = get_snapshot_store()
+
+
+# Scenario manager keeps evaluated scenarios cached per data version
+@st.cache_resource
+def get_scenario_manager():
+    return ScenarioManager()
+
+
+scenario_manager = get_scenario_manager()
 
 # Initialize session state for data storage
 if 'projects' not in st.session_state:
@@ -29,37 +60,131 @@ if 'projects' not in st.session_state:
 if 'project_counter' not in st.session_state:
     st.session_state.project_counter = 1
 
+if 'quarantined' not in st.session_state:
+    st.session_state.quarantined = pd.DataFrame()
+
 # Excel file path
 EXCEL_FILE = "rpa_projects_database.xlsx"
+CONFIG_SHEET = "config_history"
+QUARANTINE_SHEET = "quarantine"
 
+# Input columns that can be edited on the Project List page
+EDITABLE_INPUTS = [
+    'frequency', 'volume_per_freq', 'avg_handle_time', 'app_count', 'process_steps',
+    'data_type', 'logic_complexity', 'environment',
+    'ai_ocr_pages', 'ai_nlp_tokens_k', 'ai_cv_images', 'ai_ml_model', 'applications'
+] + READINESS_COLUMNS
 
-# Load data from Excel if exists
+
+# Load data from Excel if exists, validated and repaired in one pass.
+# Quarantined rows are re-checked on every load, so fixing them in Excel brings them back.
 @st.cache_data
 def load_data():
+    if not os.path.exists(EXCEL_FILE):
+        return {'valid': pd.DataFrame(), 'quarantined': pd.DataFrame(), 'issues': pd.DataFrame(), 'error': None}
+    try:
+        sheets = pd.read_excel(EXCEL_FILE, sheet_name=None)
+    except Exception as e:
+        return {'valid': pd.DataFrame(), 'quarantined': pd.DataFrame(), 'issues': pd.DataFrame(), 'error': str(e)}
+
+    raw = pd.concat(
+        [sheets[name] for name in ['projects', QUARANTINE_SHEET] if name in sheets and not sheets[name].empty],
+        ignore_index=True
+    ) if 'projects' in sheets else pd.DataFrame()
+    if raw.empty:
+        return {'valid': pd.DataFrame(), 'quarantined': pd.DataFrame(), 'issues': pd.DataFrame(), 'error': None}
+    return {**validator.validate(raw), 'error': None}
+
+
+# Load the config values each stored config version was computed with
+@st.cache_data
+def load_config_history():
     if os.path.exists(EXCEL_FILE):
         try:
-            return pd.read_excel(EXCEL_FILE, sheet_name='projects')
+            history = pd.read_excel(EXCEL_FILE, sheet_name=CONFIG_SHEET)
+            return {row.config_version: json.loads(row.config_values) for row in history.itertuples()}
         except:
-            return pd.DataFrame()
-    return pd.DataFrame()
+            return {}
+    return {}
 
 
 # Save data to Excel
 def save_data(df):
+    history = st.session_state.config_history
+    history[config_version()] = flatten_config()
+    history_df = pd.DataFrame(
+        [{'config_version': version, 'config_values': json.dumps(values, sort_keys=True)}
+         for version, values in history.items()]
+    )
     with pd.ExcelWriter(EXCEL_FILE, engine='xlsxwriter') as writer:
         df.to_excel(writer, sheet_name='projects', index=False)
+        history_df.to_excel(writer, sheet_name=CONFIG_SHEET, index=False)
+        if not st.session_state.quarantined.empty:
+            st.session_state.quarantined.to_excel(writer, sheet_name=QUARANTINE_SHEET, index=False)
+
+    # Cached reads would otherwise hand the pre-save file to the next session
+    load_data.clear()
+    load_config_history.clear()
+
+    # Record the change in the snapshot history (no-op when nothing changed)
+    if not df.empty:
+        snapshot_store.take_snapshot(df)
     return True
 
 
 # Load existing data
+if 'config_history' not in st.session_state:
+    st.session_state.config_history = dict(load_config_history())
+
 if st.session_state.projects.empty:
-    st.session_state.projects = load_data()
+    loaded = load_data()
+    st.session_state.projects = loaded['valid']
+    st.session_state.quarantined = loaded['quarantined']
+    st.session_state.load_issues = loaded['issues']
+    st.session_state.load_error = loaded['error']
+    # Quarantined rows keep their IDs, so new projects must not reuse them
+    known_ids = pd.concat([pd.Series(dtype=object)] +
+                          [frame['project_id'] for frame in (loaded['valid'], loaded['quarantined'])
+                           if 'project_id' in frame.columns])
+    if not known_ids.empty:
+        st.session_state.project_counter = validator.next_project_number(known_ids)
+
+    # Recompute columns affected by config changes since the rows were saved
+    if not st.session_state.projects.empty:
+        stored_versions = st.session_state.projects.get('config_version')
+        if stored_versions is None or (stored_versions != config_version()).any():
+            loaded_projects = st.session_state.projects
+            st.session_state.projects = refresh_stale_rows(
+                loaded_projects, st.session_state.config_history, calc
+            )
+            # Only write back when a stored value actually moved, not for new version stamps alone
+            refreshed_columns = list(DERIVATIONS) + ['reuse_discount']
+            if changed_rows(loaded_projects, st.session_state.projects, refreshed_columns).any():
+                save_data(st.session_state.projects)
+
+
+
+# Ranking index over the current projects; rebuilt only when the frame is replaced
+def get_ranking():
+    if st.session_state.get('ranking_source') is not st.session_state.projects:
+        st.session_state.ranking = RankingIndex.from_frame(st.session_state.projects)
+        st.session_state.ranking_source = st.session_state.projects
+    return st.session_state.ranking
+
+
+# Application-overlap index over the current projects; rebuilt only when the frame is replaced
+def get_shared_index():
+    if st.session_state.get('shared_source') is not st.session_state.projects:
+        st.session_state.shared_index = SharedComponentIndex.from_frame(st.session_state.projects)
+        st.session_state.shared_source = st.session_state.projects
+    return st.session_state.shared_index
+
 
 # Sidebar navigation
 st.sidebar.title("🤖 RPA Estimator 2026")
 page = st.sidebar.radio(
     "Navigate to:",
-    ["📊 Dashboard", "➕ New Project", "📋 Project List", "🎯 Magic Quadrant", "📈 Reports"]
+    ["📊 Dashboard", "➕ New Project", "📋 Project List", "🎯 Magic Quadrant", "🧪 Scenarios", "📈 Reports"]
 )
 
 # Dashboard Page
@@ -71,9 +196,9 @@ if page == "📊 Dashboard":
 
         # Calculate metrics
         total_projects = len(df)
-        total_fte_saved = df['fte_saved'].sum() if 'fte_saved' in df.columns else 0
-        total_savings = df['annual_savings'].sum() if 'annual_savings' in df.columns else 0
-        avg_roi = df['roi_percentage'].mean() if 'roi_percentage' in df.columns else 0
+        total_fte_saved = df['fte_saved'].sum()
+        total_savings = df['annual_savings'].sum()
+        avg_roi = df['roi_percentage'].mean()
 
         # Display metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -103,31 +228,30 @@ if page == "📊 Dashboard":
             )
 
         # Quick Quadrant Preview
-        if 'automation_potential' in df.columns and 'implementation_ease' in df.columns:
-            st.subheader("Portfolio Overview")
-
-            fig = px.scatter(df,
-                             x='implementation_ease',
-                             y='automation_potential',
-                             size='annual_savings' if 'annual_savings' in df.columns else None,
-                             color='quadrant' if 'quadrant' in df.columns else None,
-                             hover_data=['project_name', 'roi_percentage'] if 'project_name' in df.columns else None,
-                             title="Magic Quadrant Preview"
-                             )
-
-            # Add quadrant lines
-            fig.add_hline(y=50, line_dash="dash", line_color="gray", opacity=0.5)
-            fig.add_vline(x=50, line_dash="dash", line_color="gray", opacity=0.5)
-
-            fig.update_layout(
-                xaxis_title="Implementation Ease →",
-                yaxis_title="Automation Potential →",
-                xaxis=dict(range=[0, 100]),
-                yaxis=dict(range=[0, 100]),
-                height=500
-            )
+        st.subheader("Portfolio Overview")
+
+        fig = px.scatter(df,
+                         x='implementation_ease',
+                         y='automation_potential',
+                         size='annual_savings',
+                         color='quadrant',
+                         hover_data=['project_name', 'roi_percentage'],
+                         title="Magic Quadrant Preview"
+                         )
+
+        # Add quadrant lines
+        fig.add_hline(y=50, line_dash="dash", line_color="gray", opacity=0.5)
+        fig.add_vline(x=50, line_dash="dash", line_color="gray", opacity=0.5)
 
-            st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(
+            xaxis_title="Implementation Ease →",
+            yaxis_title="Automation Potential →",
+            xaxis=dict(range=[0, 100]),
+            yaxis=dict(range=[0, 100]),
+            height=500
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No projects yet. Add your first project to see the dashboard!")
 
@@ -142,17 +266,12 @@ elif page == "➕ New Project":
 
         with col1:
             project_name = st.text_input("Project Name *", placeholder="e.g., Invoice Processing")
-            business_area = st.selectbox("Business Area *",
-                                         ["Engineering", "Finance", "HR", "Sales", "Operations", "IT",
-                                          "Customer Service"])
+            business_area = st.selectbox("Business Area *", config.BUSINESS_AREAS)
             process_owner = st.text_input("Process Owner Email", placeholder="owner@company.com")
 
         with col2:
-            category = st.selectbox("Category",
-                                    ["Data Processing", "Report Generation", "System Integration", "Customer Service",
-                                     "Compliance"])
-            status = st.selectbox("Status",
-                                  ["Idea", "Assessment", "In Queue", "Development", "Testing", "Production"])
+            category = st.selectbox("Category", config.PROJECT_CATEGORIES)
+            status = st.selectbox("Status", config.PROJECT_STATUSES)
 
         description = st.text_area("Description", placeholder="Describe the process to be automated...")
 
@@ -179,24 +298,24 @@ elif page == "➕ New Project":
         with col1:
             rules_based = st.select_slider(
                 "Decisions have straightforward rules",
-                options=["Strongly Disagree", "Disagree", "Neutral", "Agree", "Strongly Agree"],
+                options=config.READINESS_ANSWERS,
                 value="Agree"
             )
             digital_data = st.select_slider(
                 "Input data is accessed digitally",
-                options=["Strongly Disagree", "Disagree", "Neutral", "Agree", "Strongly Agree"],
+                options=config.READINESS_ANSWERS,
                 value="Agree"
             )
 
         with col2:
             data_formatted = st.select_slider(
                 "Data is highly formatted",
-                options=["Strongly Disagree", "Disagree", "Neutral", "Agree", "Strongly Agree"],
+                options=config.READINESS_ANSWERS,
                 value="Agree"
             )
             process_stable = st.select_slider(
                 "Process is stable (no changes expected)",
-                options=["Strongly Disagree", "Disagree", "Neutral", "Agree", "Strongly Agree"],
+                options=config.READINESS_ANSWERS,
                 value="Agree"
             )
 
@@ -213,6 +332,8 @@ elif page == "➕ New Project":
         with col3:
             environment = st.selectbox("Environment", list(config.COMPLEXITY_FACTORS['environment'].keys()))
 
+        applications = st.text_input("Applications Used", placeholder="e.g., SAP, Outlook, Salesforce")
+
         # Section 5: AI Components (Optional)
         st.subheader("5️⃣ AI/ML Components (Optional)")
 
@@ -256,15 +377,10 @@ elif page == "➕ New Project":
         dev_days, total_days = calc.calculate_effort_days(process_steps, complexity_score)
 
         # Calculate AI costs
-        ai_monthly_cost = (
-                (ocr_pages * config.AI_COSTS['ocr_per_page']) +
-                (nlp_tokens * config.AI_COSTS['nlp_per_1k_tokens']) +
-                (cv_images * config.AI_COSTS['cv_per_image']) +
-                (config.AI_COSTS['ml_custom_model'] / 12 if use_ml else 0)
-        )
+        ai_monthly_cost = calc.calculate_ai_monthly_cost(ocr_pages, nlp_tokens, cv_images, use_ml)
 
         # Calculate FTE savings (80% efficiency)
-        fte_saved = fte_required * config.FTE_CONSTANTS['automation_efficiency']
+        fte_saved = calc.calculate_fte_saved(fte_required)
 
         # Calculate costs and ROI
         financials = calc.calculate_costs_and_roi(total_days, fte_saved, ai_monthly_cost)
@@ -298,6 +414,16 @@ elif page == "➕ New Project":
 
         st.info(f"**Quadrant:** {quadrant} | **Priority Score:** {priority_score:.0f}/100")
 
+        # Where the project lands in the existing portfolio
+        ranking = get_ranking()
+        if ranking.entries:
+            roi_pct = ranking.percentile('roi_percentage', financials['roi_percentage'])
+            priority_pct = ranking.percentile('priority_score', priority_score)
+            area_pct = ranking.percentile('priority_score', priority_score, business_area)
+            area_text = f" | **Within {business_area}:** {area_pct:.0f}th percentile" if area_pct is not None else ""
+            st.info(f"**ROI:** {roi_pct:.0f}th percentile | **Priority:** {priority_pct:.0f}th percentile"
+                    f"{area_text}")
+
         # Create project record
         new_project = pd.DataFrame([{
             'project_id': f"P{st.session_state.project_counter:04d}",
@@ -318,6 +444,7 @@ elif page == "➕ New Project":
             'app_count': app_count,
             'process_steps': process_steps,
             'automation_potential': automation_potential,
+            **dict(zip(READINESS_COLUMNS, [rules_based, digital_data, data_formatted, process_stable])),
             'implementation_ease': implementation_ease,
             'complexity_score': complexity_score,
             'dev_days': dev_days,
@@ -329,16 +456,41 @@ elif page == "➕ New Project":
             'quadrant': quadrant,
             'priority_score': priority_score,
             'ai_monthly_cost': ai_monthly_cost,
+            'ai_ocr_pages': ocr_pages,
+            'ai_nlp_tokens_k': nlp_tokens,
+            'ai_cv_images': cv_images,
+            'ai_ml_model': int(use_ml),
             'data_type': data_type,
             'logic_complexity': logic_complexity,
             'environment': environment,
-            'created_date': datetime.now().strftime('%Y-%m-%d')
+            'applications': format_applications([applications]),
+            'reuse_discount': 0.0,
+            'created_date': datetime.now().strftime('%Y-%m-%d'),
+            'config_version': config_version()
         }])
 
         # Add to session state
-        st.session_state.projects = pd.concat([st.session_state.projects, new_project], ignore_index=True)
+        ranking = get_ranking()
+        shared_index = get_shared_index()
+        projects = pd.concat([st.session_state.projects, new_project], ignore_index=True)
         st.session_state.project_counter += 1
 
+        # Connectors already built by other projects reduce this project's effort
+        new_id = new_project['project_id'].iloc[0]
+        shared_index.add_project(new_id, new_project['applications'].iloc[0])
+        if discounts_active(st.session_state.projects):
+            projects = apply_reuse_discounts(projects, shared_index, calc,
+                                             rows=projects['project_id'] == new_id)
+            reuse_discount = projects['reuse_discount'].iloc[-1]
+            if reuse_discount > 0:
+                st.info(f"🔗 Reuses existing connectors: total effort reduced by {reuse_discount:.0%} "
+                        f"to {projects['total_days'].iloc[-1]:.0f} days")
+
+        st.session_state.projects = projects
+        ranking.upsert(projects.iloc[-1])
+        st.session_state.ranking_source = projects
+        st.session_state.shared_source = projects
+
         # Save to Excel
         if save_data(st.session_state.projects):
             st.success(f"✅ Project '{project_name}' saved to database!")
@@ -354,13 +506,13 @@ elif page == "📋 Project List":
         col1, col2, col3 = st.columns(3)
         with col1:
             filter_area = st.multiselect("Filter by Business Area",
-                                         options=df['business_area'].unique() if 'business_area' in df.columns else [])
+                                         options=df['business_area'].unique())
         with col2:
             filter_status = st.multiselect("Filter by Status",
-                                           options=df['status'].unique() if 'status' in df.columns else [])
+                                           options=df['status'].unique())
         with col3:
             filter_quadrant = st.multiselect("Filter by Quadrant",
-                                             options=df['quadrant'].unique() if 'quadrant' in df.columns else [])
+                                             options=df['quadrant'].unique())
 
         # Apply filters
         filtered_df = df.copy()
@@ -386,6 +538,83 @@ elif page == "📋 Project List":
             use_container_width=True
         )
 
+        # Edit project inputs; only the dependent columns are recomputed
+        with st.expander("✏️ Edit Projects"):
+            editable = EDITABLE_INPUTS
+            # Categories drive the calculations: only values from config.py can be picked
+            column_config = {
+                column: st.column_config.SelectboxColumn(options=list(options), required=True)
+                for column, options in (('frequency', config.FREQUENCY_MULTIPLIERS),
+                                        ('data_type', config.COMPLEXITY_FACTORS['data']),
+                                        ('logic_complexity', config.COMPLEXITY_FACTORS['logic']),
+                                        ('environment', config.COMPLEXITY_FACTORS['environment']))
+            }
+            column_config.update({
+                column: st.column_config.SelectboxColumn(options=config.READINESS_ANSWERS)
+                for column in READINESS_COLUMNS
+            })
+            column_config.update({
+                column: st.column_config.NumberColumn(min_value=1, step=1, required=True)
+                for column in ('volume_per_freq', 'avg_handle_time', 'app_count', 'process_steps')
+            })
+            edited = st.data_editor(df[['project_id'] + editable], disabled=['project_id'],
+                                    column_config=column_config, hide_index=True,
+                                    use_container_width=True, key="project_editor")
+
+            if st.button("💾 Save Changes"):
+                changed = edited[editable].ne(df[editable]) & ~(edited[editable].isna() & df[editable].isna())
+                changed_inputs = [col for col in editable if changed[col].any()]
+
+                if changed_inputs:
+                    updated = df.copy()
+                    updated[editable] = edited[editable]
+                    # Older rows have no readiness answers: their potential cannot follow these edits
+                    potential_inputs = ['frequency', 'volume_per_freq', 'data_type']
+                    without_answers = (changed[potential_inputs].any(axis=1)
+                                       & updated[READINESS_COLUMNS].isna().any(axis=1))
+                    if without_answers.any():
+                        st.warning(f"Automation potential kept as stored for {int(without_answers.sum())} project(s) "
+                                   "without readiness answers. Fill in the readiness columns to recalculate it.")
+                    ranking = get_ranking()
+                    projects = recompute_derived(
+                        updated, changed_inputs=changed_inputs, rows=changed.any(axis=1), calculator=calc
+                    )
+                    if 'applications' in changed_inputs and discounts_active(df):
+                        # Connector builders may change; the indexes rebuild from the new frame
+                        st.session_state.projects = apply_reuse_discounts(projects, calculator=calc)
+                    else:
+                        st.session_state.projects = projects
+                        ranking.upsert_frame(projects[changed.any(axis=1)])
+                        st.session_state.ranking_source = projects
+                    save_data(st.session_state.projects)
+                    st.success(f"✅ Updated {int(changed.any(axis=1).sum())} project(s)")
+                    st.rerun()
+                else:
+                    st.info("No changes to save.")
+
+        # Shared components across projects
+        with st.expander("🔗 Shared Components"):
+            st.caption("Projects that automate the same applications share connectors. The first project "
+                       "(by ID) builds each connector; later projects get a reuse discount on total effort.")
+            clusters = get_shared_index().cluster_summary(df)
+            if clusters.empty:
+                st.info("No projects share applications yet. Add 'Applications Used' to projects to find overlaps.")
+            else:
+                st.dataframe(clusters.style.format({'days_saved': '{:,.1f}'}),
+                             use_container_width=True, hide_index=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                apply_clicked = st.button("Apply Reuse Discounts")
+            with col2:
+                clear_clicked = st.button("Clear Reuse Discounts")
+
+            if apply_clicked or clear_clicked:
+                st.session_state.projects = apply_reuse_discounts(df, get_shared_index(), calc,
+                                                                  enabled=apply_clicked)
+                save_data(st.session_state.projects)
+                st.rerun()
+
         # Export button
         st.download_button(
             label="📥 Download Project List (Excel)",
@@ -400,7 +629,7 @@ elif page == "📋 Project List":
 elif page == "🎯 Magic Quadrant":
     st.title("🎯 Magic Quadrant Analysis")
 
-    if not st.session_state.projects.empty and 'automation_potential' in st.session_state.projects.columns:
+    if not st.session_state.projects.empty:
         df = st.session_state.projects
 
         # Create the quadrant chart
@@ -431,7 +660,7 @@ elif page == "🎯 Magic Quadrant":
                 text=quadrant_df.index + 1,
                 textposition="middle center",
                 marker=dict(
-                    size=quadrant_df['annual_savings'] / 10000 if 'annual_savings' in quadrant_df else 20,
+                    size=quadrant_df['annual_savings'] / 10000,
                     sizemin=10
                 ),
                 hovertemplate="<b>%{hovertext}</b><br>" +
@@ -475,6 +704,80 @@ elif page == "🎯 Magic Quadrant":
     else:
         st.info("Add projects to see the Magic Quadrant visualization!")
 
+# Scenarios Page
+elif page == "🧪 Scenarios":
+    st.title("🧪 What-if Scenarios")
+
+    if not st.session_state.projects.empty:
+        df = st.session_state.projects
+        scenarios = scenario_manager.scenarios()
+
+        selected = st.multiselect("Compare scenarios", options=list(scenarios.keys()),
+                                  default=list(scenarios.keys()))
+
+        if selected:
+            results = scenario_manager.evaluate_all(df, selected)
+
+            # Portfolio level
+            st.subheader("Portfolio Comparison")
+            summary = scenario_manager.portfolio_summary(results)
+            st.dataframe(summary.style.format('{:,.1f}'), use_container_width=True)
+
+            # Project level
+            st.subheader("Project Changes")
+            focus = st.selectbox("Scenario", selected)
+            diff = scenario_manager.project_diff(results[BASELINE], results[focus])
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Projects Changing Quadrant", int(diff['quadrant_changed'].sum()))
+            with col2:
+                st.metric("Average ROI Change", f"{diff['roi_change'].mean():+.0f} pts")
+            with col3:
+                st.metric("Average Priority Change", f"{diff['priority_change'].mean():+.1f}")
+
+            st.write("**Quadrant moves** (rows: baseline, columns: scenario)")
+            st.dataframe(scenario_manager.quadrant_moves(diff), use_container_width=True)
+
+            only_changed = st.checkbox("Only projects that change quadrant", value=True)
+            shown = diff[diff['quadrant_changed']] if only_changed else diff
+            st.dataframe(
+                shown.sort_values('priority_change', key=abs, ascending=False).style.format({
+                    'roi_percentage_base': '{:.0f}%', 'roi_percentage_scenario': '{:.0f}%',
+                    'roi_change': '{:+.0f}', 'priority_score_base': '{:.0f}',
+                    'priority_score_scenario': '{:.0f}', 'priority_change': '{:+.1f}'
+                }),
+                use_container_width=True, hide_index=True
+            )
+
+        # Scenario editor
+        with st.expander("➕ Save a Scenario"):
+            with st.form("scenario_form"):
+                name = st.text_input("Scenario Name", placeholder="e.g., Nearshore rates")
+                overrides = st.data_editor(
+                    pd.DataFrame({'config_key': ['TIMELINE_FACTORS.daily_rate_default'], 'value': [800.0]}),
+                    num_rows="dynamic", use_container_width=True, hide_index=True,
+                    column_config={'config_key': st.column_config.SelectboxColumn(
+                        options=[key for key, value in flatten_config().items()
+                                 if isinstance(value, (int, float)) and not isinstance(value, bool)]
+                    )}
+                )
+                saved = st.form_submit_button("💾 Save Scenario")
+
+            if saved:
+                config_overrides = {row.config_key: float(row.value)
+                                    for row in overrides.dropna().itertuples()}
+                if not name:
+                    st.error("Please give the scenario a name.")
+                elif name.strip().lower() == BASELINE.lower():
+                    st.error(f"'{BASELINE}' is reserved for the current portfolio. Please pick another name.")
+                else:
+                    scenario_manager.save_scenario(name, config_overrides)
+                    st.success(f"✅ Scenario '{name}' saved")
+                    st.rerun()
+    else:
+        st.info("Add projects to compare scenarios!")
+
 # Reports Page
 elif page == "📈 Reports":
     st.title("📈 Reports & Analytics")
@@ -503,15 +806,16 @@ elif page == "📈 Reports":
 
         # Priority Scores
         st.subheader("Top 10 Priority Projects")
-        top_projects = df.nlargest(10, 'priority_score')[
+        top_ids = get_ranking().top_n('priority_score', 10)
+        top_projects = df.set_index('project_id').loc[top_ids].reset_index()[
             ['project_name', 'priority_score', 'roi_percentage', 'fte_saved', 'quadrant']
         ]
         st.dataframe(top_projects, use_container_width=True)
 
         # Financial Summary
         st.subheader("Financial Impact")
-        total_investment = df['implementation_cost'].sum() if 'implementation_cost' in df.columns else 0
-        total_annual_savings = df['annual_savings'].sum() if 'annual_savings' in df.columns else 0
+        total_investment = df['implementation_cost'].sum()
+        total_annual_savings = df['annual_savings'].sum()
         portfolio_roi = (
                     (total_annual_savings - total_investment) / total_investment * 100) if total_investment > 0 else 0
 
@@ -522,6 +826,103 @@ elif page == "📈 Reports":
             st.metric("Total Annual Savings", f"${total_annual_savings:,.0f}")
         with col3:
             st.metric("Portfolio ROI", f"{portfolio_roi:.0f}%")
+
+        # AI spend projection under the current price tiers
+        st.subheader("🤖 AI Spend Projection")
+        col1, col2 = st.columns(2)
+        with col1:
+            projection_months = st.slider("Months", 3, 36, config.AI_GROWTH['projection_months'])
+        with col2:
+            growth_pct = st.number_input("Monthly volume growth (%)",
+                                         value=config.AI_GROWTH['monthly_growth_rate'] * 100, step=0.5)
+
+        ai_costs = calc.project_portfolio_ai_costs(df, projection_months, growth_pct / 100)
+        ai_by_component = pd.DataFrame(
+            {component: ai_costs[component].sum() for component in ['ocr', 'nlp', 'cv', 'ml']}
+        )
+        ai_by_component['flat (no AI inputs)'] = ai_costs['total'].sum() - ai_by_component.sum(axis=1)
+        ai_by_component.index.name = 'month'
+        ai_long = ai_by_component.reset_index().melt(id_vars='month', var_name='component', value_name='cost')
+
+        fig_ai = px.area(ai_long, x='month', y='cost', color='component',
+                         title="Projected Monthly AI Spend by Component",
+                         labels={'month': 'Month', 'cost': 'Cost ($)'})
+        st.plotly_chart(fig_ai, use_container_width=True)
+        st.metric(f"Projected AI Spend ({projection_months} months)", f"${ai_costs['total'].to_numpy().sum():,.0f}")
+
+        # Trends from the snapshot history
+        st.subheader("📅 Portfolio Trends")
+        trends = snapshot_store.monthly_trends()
+
+        if trends.empty:
+            st.info("No snapshots yet. A snapshot is recorded every time the portfolio is saved.")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                fig_savings = px.line(trends, x='month', y='annual_savings', markers=True,
+                                      title="Pipeline Annual Savings",
+                                      labels={'month': 'Month', 'annual_savings': 'Annual Savings ($)'})
+                st.plotly_chart(fig_savings, use_container_width=True)
+            with col2:
+                fig_fte = px.line(trends, x='month', y='fte_saved', markers=True,
+                                  title="Pipeline FTE Saved",
+                                  labels={'month': 'Month', 'fte_saved': 'FTE Saved'})
+                st.plotly_chart(fig_fte, use_container_width=True)
+
+            quadrant_mix = trends.melt(id_vars='month', value_vars=config.QUADRANTS,
+                                       var_name='quadrant', value_name='projects')
+            fig_mix = px.bar(quadrant_mix, x='month', y='projects', color='quadrant',
+                             title="Quadrant Mix by Month",
+                             labels={'month': 'Month', 'projects': 'Number of Projects'})
+            st.plotly_chart(fig_mix, use_container_width=True)
+
+            # Point-in-time view
+            manifest = snapshot_store.manifest()
+            as_of_date = st.date_input("Show portfolio as of",
+                                       value=manifest['taken_at'].max().date(),
+                                       min_value=manifest['taken_at'].min().date(),
+                                       max_value=datetime.now().date())
+            past = snapshot_store.as_of(pd.Timestamp(as_of_date) + pd.Timedelta(days=1))
+
+            if past.empty:
+                st.info("No snapshot on or before that date.")
+            else:
+                past_savings = past['annual_savings'].sum()
+                past_fte = past['fte_saved'].sum()
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Projects", len(past), delta=f"{len(df) - len(past):+d} since")
+                with col2:
+                    st.metric("Annual Savings", f"${past_savings:,.0f}",
+                              delta=f"${total_annual_savings - past_savings:+,.0f} since")
+                with col3:
+                    st.metric("FTE Saved", f"{past_fte:.1f}", delta=f"{df['fte_saved'].sum() - past_fte:+.1f} since")
+
+            st.caption(f"{len(manifest)} snapshots, {snapshot_store.storage_rows():,} rows stored "
+                       f"(changed rows only, full checkpoint every "
+                       f"{snapshot_store.checkpoint_interval} snapshots)")
+
+        # Offline report packs
+        st.subheader("📦 Department Report Packs")
+        st.caption("One self-contained HTML and XLSX report per business area, rendered in parallel.")
+
+        if st.button("Generate Report Packs"):
+            with st.spinner("Rendering reports..."), tempfile.TemporaryDirectory() as output_dir:
+                paths = generate_reports(df, output_dir)
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for path in paths:
+                        archive.write(path, os.path.basename(path))
+            st.session_state.report_packs = buffer.getvalue()
+            st.success(f"✅ Generated {len(paths)} report files")
+
+        if st.session_state.get('report_packs'):
+            st.download_button(
+                label="📥 Download Report Packs (ZIP)",
+                data=st.session_state.report_packs,
+                file_name=f"rpa_reports_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip"
+            )
     else:
         st.info("No projects yet. Add projects to see reports!")
 
@@ -529,5 +930,15 @@ elif page == "📈 Reports":
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📁 Database")
 st.sidebar.info(f"Projects are saved to:\n`{EXCEL_FILE}`")
+if st.session_state.get('load_error'):
+    st.sidebar.error(f"Could not read `{EXCEL_FILE}`: {st.session_state.load_error}")
+issues = st.session_state.get('load_issues', pd.DataFrame())
+if not issues.empty:
+    st.sidebar.warning(
+        f"{len(issues)} data issue(s) repaired on load; "
+        f"{len(st.session_state.quarantined)} row(s) quarantined to the `{QUARANTINE_SHEET}` sheet"
+    )
+    with st.sidebar.expander("🔍 Data Issues"):
+        st.dataframe(issues, use_container_width=True, hide_index=True)
 st.sidebar.markdown("### 🚀 Deployment")
 st.sidebar.markdown("[Deploy to Streamlit Cloud](https://streamlit.io/cloud)")
\ No newline at end of file
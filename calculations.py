@@ -2,16 +2,58 @@
 Core calculation engine for RPA project estimation
 """
 
+import numpy as np
 import pandas as pd
 import config
 
+# Stored AI inputs per project: component -> volume column
+AI_VOLUME_COLUMNS = {
+    'ocr': 'ai_ocr_pages',
+    'nlp': 'ai_nlp_tokens_k',
+    'cv': 'ai_cv_images'
+}
+AI_MODEL_COLUMN = 'ai_ml_model'
+
+# Stored readiness answers, in calculate_automation_potential argument order
+READINESS_COLUMNS = ['readiness_rules_based', 'readiness_digital_data', 'readiness_data_formatted',
+                     'readiness_process_stable']
+
+
+# Formulas below take one project's values or a Series per input (one row per project)
+
+def _like(values, template):
+    """Return a numpy result as a Series aligned with template, or as a plain scalar"""
+    if isinstance(template, pd.Series):
+        return pd.Series(values, index=template.index)
+    return np.asarray(values).item()
+
+
+def _lookup(values, table, default):
+    """Look values up in a config table, falling back to default"""
+    if isinstance(values, pd.Series):
+        return values.map(table).fillna(default)
+    return table.get(values, default)
+
+
+def _isin(values, options):
+    if isinstance(values, pd.Series):
+        return values.isin(options).to_numpy()
+    return values in options
+
+
+def _contains(values, text):
+    if isinstance(values, pd.Series):
+        return values.astype(str).str.contains(text, regex=False).to_numpy()
+    return text in str(values)
+
+
 class RPACalculator:
     def __init__(self):
         self.config = config
 
     def calculate_annual_volume(self, frequency, volume_per_freq):
         """Calculate annual transaction volume"""
-        multiplier = self.config.FREQUENCY_MULTIPLIERS.get(frequency, 1)
+        multiplier = _lookup(frequency, self.config.FREQUENCY_MULTIPLIERS, 1)
         return volume_per_freq * multiplier
 
     def calculate_annual_hours(self, annual_volume, avg_handle_time_min):
@@ -24,35 +66,30 @@ class RPACalculator:
         shrinkage = self.config.FTE_CONSTANTS['shrinkage_factor']
         return (annual_hours * shrinkage) / productive_hours
 
+    def calculate_fte_saved(self, fte_required):
+        """Calculate FTE freed by the automation"""
+        return fte_required * self.config.FTE_CONSTANTS['automation_efficiency']
+
     def calculate_automation_potential(self, rules_based, digital_data,
                                       data_formatted, process_stable,
                                       annual_volume, data_type):
         """Calculate automation potential (0-100%)"""
         score = 0
 
-        # Scoring based on answers (max 90 points)
-        score += 30 if rules_based in ['Agree', 'Strongly Agree'] else 15 if rules_based == 'Neutral' else 0
-        score += 25 if digital_data in ['Agree', 'Strongly Agree'] else 12 if digital_data == 'Neutral' else 0
-        score += 20 if data_formatted in ['Agree', 'Strongly Agree'] else 10 if data_formatted == 'Neutral' else 0
-        score += 15 if process_stable in ['Agree', 'Strongly Agree'] else 7 if process_stable == 'Neutral' else 0
+        # Scoring based on answers (max 90 points): (agree, neutral) points per question
+        for answer, (agree, neutral) in ((rules_based, (30, 15)), (digital_data, (25, 12)),
+                                         (data_formatted, (20, 10)), (process_stable, (15, 7))):
+            score += np.select([_isin(answer, ['Agree', 'Strongly Agree']), _isin(answer, ['Neutral'])],
+                               [agree, neutral], 0)
 
         # Volume bonus (10 points)
-        if annual_volume > 10000:
-            score += 10
-        elif annual_volume > 5000:
-            score += 7
-        elif annual_volume > 1000:
-            score += 5
-        else:
-            score += 2
+        score += np.select([annual_volume > 10000, annual_volume > 5000, annual_volume > 1000], [10, 7, 5], 2)
 
         # Apply data type penalty
-        if 'Unstructured' in data_type:
-            score *= 0.6
-        elif 'Semi-structured' in data_type:
-            score *= 0.8
+        score = score * np.select([_contains(data_type, 'Unstructured'), _contains(data_type, 'Semi-structured')],
+                                  [0.6, 0.8], 1.0)
 
-        return min(score, 95)  # Cap at 95%
+        return _like(np.minimum(score, 95), annual_volume)  # Cap at 95%
 
     def calculate_implementation_ease(self, app_count, logic_complexity,
                                      environment, data_type):
@@ -60,110 +97,178 @@ class RPACalculator:
         score = 100
 
         # Deduct for complexity
-        if app_count >= 6:
-            score -= 40
-        elif app_count >= 4:
-            score -= 30
-        elif app_count >= 3:
-            score -= 20
-        elif app_count >= 2:
-            score -= 10
-
-        if 'Complex' in logic_complexity:
-            score -= 30
-        elif 'Moderate' in logic_complexity:
-            score -= 15
-
-        if 'Citrix' in environment:
-            score -= 40
-        elif 'Mainframe' in environment:
-            score -= 35
-        elif 'Web' in environment:
-            score -= 20
-        elif 'Desktop' in environment:
-            score -= 10
-        elif 'API' in environment:
-            score += 10
-
-        if 'Unstructured' in data_type:
-            score -= 25
-        elif 'Semi-structured' in data_type:
-            score -= 10
-
-        return max(0, min(100, score))
+        score -= np.select([app_count >= 6, app_count >= 4, app_count >= 3, app_count >= 2],
+                           [40, 30, 20, 10], 0)
+
+        score -= np.select([_contains(logic_complexity, 'Complex'), _contains(logic_complexity, 'Moderate')],
+                           [30, 15], 0)
+
+        score -= np.select(
+            [_contains(environment, 'Citrix'), _contains(environment, 'Mainframe'),
+             _contains(environment, 'Web'), _contains(environment, 'Desktop'), _contains(environment, 'API')],
+            [40, 35, 20, 10, -10], 0
+        )
+
+        score -= np.select([_contains(data_type, 'Unstructured'), _contains(data_type, 'Semi-structured')],
+                           [25, 10], 0)
+
+        return _like(np.clip(score, 0, 100), app_count)
 
     def calculate_complexity_score(self, data_type, app_count,
                                   logic_complexity, environment):
         """Calculate complexity multiplier"""
-        data_mult = self.config.COMPLEXITY_FACTORS['data'].get(data_type, 1.0)
-        app_mult = self.config.COMPLEXITY_FACTORS['applications'].get(min(app_count, 6), 2.5)
-        logic_mult = self.config.COMPLEXITY_FACTORS['logic'].get(logic_complexity, 1.0)
-        env_mult = self.config.COMPLEXITY_FACTORS['environment'].get(environment, 1.5)
+        data_mult = _lookup(data_type, self.config.COMPLEXITY_FACTORS['data'], 1.0)
+        app_mult = _lookup(np.minimum(app_count, 6), self.config.COMPLEXITY_FACTORS['applications'], 2.5)
+        logic_mult = _lookup(logic_complexity, self.config.COMPLEXITY_FACTORS['logic'], 1.0)
+        env_mult = _lookup(environment, self.config.COMPLEXITY_FACTORS['environment'], 1.5)
 
         return data_mult * app_mult * logic_mult * env_mult
 
-    def calculate_effort_days(self, process_steps, complexity_score):
+    def calculate_dev_days(self, process_steps, complexity_score):
         """Calculate development effort in days"""
         base_days = process_steps * self.config.TIMELINE_FACTORS['base_days_per_step']
-        dev_days = base_days * complexity_score
+        return base_days * complexity_score
 
-        # Add testing and contingency
+    def calculate_total_days(self, dev_days, reuse_discount=0):
+        """Add testing and contingency; reuse_discount is the share saved on shared connectors"""
         testing = self.config.TIMELINE_FACTORS['testing_factor']
         contingency = self.config.TIMELINE_FACTORS['contingency_buffer']
+        return dev_days * (1 + testing) * (1 + contingency) * (1 - reuse_discount)
 
-        total_days = dev_days * (1 + testing) * (1 + contingency)
-        return dev_days, total_days
+    def calculate_effort_days(self, process_steps, complexity_score):
+        """Calculate development and total effort in days"""
+        dev_days = self.calculate_dev_days(process_steps, complexity_score)
+        return dev_days, self.calculate_total_days(dev_days)
 
-    def calculate_costs_and_roi(self, total_days, fte_saved, ai_monthly_cost=0):
-        """Calculate costs and ROI"""
-        daily_rate = self.config.TIMELINE_FACTORS['daily_rate_default']
+    def calculate_implementation_cost(self, total_days):
+        return total_days * self.config.TIMELINE_FACTORS['daily_rate_default']
+
+    def calculate_annual_savings(self, fte_saved):
         hourly_rate = self.config.FTE_CONSTANTS['hourly_rate_default']
         annual_hours = self.config.FTE_CONSTANTS['annual_work_hours']
+        return fte_saved * hourly_rate * annual_hours
 
-        # Costs
-        implementation_cost = total_days * daily_rate
+    def calculate_roi(self, implementation_cost, annual_savings, ai_monthly_cost=0):
+        """Calculate ROI (%) and payback (months); no implementation cost means no ROI"""
         annual_ai_cost = ai_monthly_cost * 12
         total_cost = implementation_cost + annual_ai_cost
-
-        # Savings
-        annual_savings = fte_saved * hourly_rate * annual_hours
         net_savings = annual_savings - annual_ai_cost
 
-        # ROI
-        if total_cost > 0:
-            roi_percentage = ((net_savings - implementation_cost) / implementation_cost) * 100
-            payback_months = (implementation_cost / net_savings) * 12 if net_savings > 0 else 999
-        else:
-            roi_percentage = 0
-            payback_months = 999
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi_percentage = np.divide(net_savings - implementation_cost, implementation_cost) * 100
+            payback_months = np.divide(implementation_cost, net_savings) * 12
+        roi_percentage = np.where(total_cost > 0, roi_percentage, 0)
+        roi_percentage = np.nan_to_num(roi_percentage, nan=0, posinf=0, neginf=0)
+        payback_months = np.minimum(np.where((total_cost > 0) & (net_savings > 0), payback_months, 999), 999)
+
+        return _like(roi_percentage, implementation_cost), _like(payback_months, implementation_cost)
+
+    def calculate_costs_and_roi(self, total_days, fte_saved, ai_monthly_cost=0):
+        """Calculate costs and ROI"""
+        implementation_cost = self.calculate_implementation_cost(total_days)
+        annual_ai_cost = ai_monthly_cost * 12
+        annual_savings = self.calculate_annual_savings(fte_saved)
+        roi_percentage, payback_months = self.calculate_roi(implementation_cost, annual_savings, ai_monthly_cost)
 
         return {
             'implementation_cost': implementation_cost,
             'annual_ai_cost': annual_ai_cost,
-            'total_cost': total_cost,
+            'total_cost': implementation_cost + annual_ai_cost,
             'annual_savings': annual_savings,
-            'net_savings': net_savings,
+            'net_savings': annual_savings - annual_ai_cost,
             'roi_percentage': roi_percentage,
-            'payback_months': min(payback_months, 999)
+            'payback_months': payback_months
         }
 
+    def calculate_tiered_cost(self, volumes, tiers):
+        """Graduated cost of monthly volumes under a (volume from, unit price) tier table"""
+        volumes = np.nan_to_num(np.asarray(volumes, dtype=float))
+        starts = np.array([tier[0] for tier in tiers], dtype=float)
+        prices = np.array([tier[1] for tier in tiers], dtype=float)
+        widths = np.append(starts[1:], np.inf) - starts
+
+        # Units falling in each tier, broadcast over any volume shape
+        in_tier = np.clip(volumes[..., None] - starts, 0, widths)
+        return (in_tier * prices).sum(axis=-1)
+
+    def calculate_ai_costs(self, ocr_pages=0, nlp_tokens_k=0, cv_images=0, use_ml=False,
+                           months=1, growth_rate=0.0):
+        """
+        Project AI costs per component over months (vectorized across projects).
+        Inputs may be scalars or arrays of one value per project; returns a dict of
+        arrays shaped (projects, months) for 'ocr', 'nlp', 'cv', 'ml' and 'total'.
+        """
+        tiers = self.config.AI_PRICE_TIERS
+        growth = np.power.outer(1 + np.atleast_1d(np.asarray(growth_rate, dtype=float)), np.arange(months))
+
+        costs = {}
+        for component, volume in (('ocr', ocr_pages), ('nlp', nlp_tokens_k), ('cv', cv_images)):
+            volumes = np.atleast_1d(np.asarray(volume, dtype=float))[:, None] * growth
+            costs[component] = self.calculate_tiered_cost(volumes, tiers[component])
+
+        ml_monthly = self.config.AI_COSTS['ml_custom_model'] / 12
+        ml = np.nan_to_num(np.atleast_1d(np.asarray(use_ml, dtype=float)))[:, None] * ml_monthly
+        costs['ml'] = ml * np.ones(months)
+
+        shape = np.broadcast_shapes(*(cost.shape for cost in costs.values()))
+        costs = {component: np.broadcast_to(cost, shape) for component, cost in costs.items()}
+        costs['total'] = sum(costs.values())
+        return costs
+
+    def calculate_ai_monthly_cost(self, ocr_pages=0, nlp_tokens_k=0, cv_images=0, use_ml=False):
+        """Calculate first-month AI cost for one project"""
+        costs = self.calculate_ai_costs(ocr_pages, nlp_tokens_k, cv_images, use_ml)
+        return float(costs['total'][0, 0])
+
+    def project_portfolio_ai_costs(self, df, months=None, growth_rate=None):
+        """
+        Re-project AI spend for every project from its stored AI inputs.
+        Returns a dict of DataFrames (projects x months) per component and 'total'.
+        Projects without stored AI inputs keep their flat ai_monthly_cost.
+        """
+        months = months or self.config.AI_GROWTH['projection_months']
+        if growth_rate is None:
+            growth_rate = self.config.AI_GROWTH['monthly_growth_rate']
+
+        columns = list(AI_VOLUME_COLUMNS.values()) + [AI_MODEL_COLUMN]
+        inputs = df.reindex(columns=columns)
+        has_inputs = inputs.notna().all(axis=1).to_numpy()
+
+        costs = self.calculate_ai_costs(
+            inputs[AI_VOLUME_COLUMNS['ocr']].fillna(0).to_numpy(),
+            inputs[AI_VOLUME_COLUMNS['nlp']].fillna(0).to_numpy(),
+            inputs[AI_VOLUME_COLUMNS['cv']].fillna(0).to_numpy(),
+            inputs[AI_MODEL_COLUMN].fillna(0).to_numpy(),
+            months=months,
+            growth_rate=growth_rate
+        )
+
+        # Fall back to the stored flat monthly cost where inputs are unknown
+        flat = df['ai_monthly_cost'].fillna(0).to_numpy() if 'ai_monthly_cost' in df else np.zeros(len(df))
+        costs['total'] = np.where(has_inputs[:, None], costs['total'], flat[:, None])
+
+        month_labels = [f"M{m + 1}" for m in range(months)]
+        return {component: pd.DataFrame(values, index=df.index, columns=month_labels)
+                for component, values in costs.items()}
+
     def determine_quadrant(self, automation_potential, implementation_ease):
         """Determine which quadrant the project falls into"""
-        if automation_potential >= 50 and implementation_ease >= 50:
-            return "🚀 Quick Win"
-        elif automation_potential >= 50 and implementation_ease < 50:
-            return "💎 Strategic"
-        elif automation_potential < 50 and implementation_ease >= 50:
-            return "🔧 Fill-in"
-        else:
-            return "⏸️ Nice to Have"
+        high_potential = np.asarray(automation_potential >= 50)
+        easy = np.asarray(implementation_ease >= 50)
+        quick_win, strategic, fill_in, nice_to_have = config.QUADRANTS
+        quadrant = np.select(
+            [high_potential & easy, high_potential & ~easy, ~high_potential & easy],
+            [quick_win, strategic, fill_in],
+            nice_to_have
+        )
+        return _like(quadrant, automation_potential)
 
     def calculate_priority_score(self, automation_potential, roi_percentage,
                                 implementation_ease, fte_saved):
         """Calculate priority score (0-100)"""
         # Normalize values
-        roi_norm = min(roi_percentage / 500, 1) * 100  # Normalize to 100
-        fte_norm = min(fte_saved / 10, 1) * 100  # Normalize to 100
+        roi_norm = np.minimum(roi_percentage / 500, 1) * 100  # Normalize to 100
+        fte_norm = np.minimum(fte_saved / 10, 1) * 100  # Normalize to 100
 
         # Weighted score
         score = (
@@ -173,4 +278,4 @@ class RPACalculator:
             fte_norm * 0.20
         )
 
-        return min(score, 100)
\ No newline at end of file
+        return np.minimum(score, 100)
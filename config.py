@@ -56,10 +56,92 @@ FREQUENCY_MULTIPLIERS = {
     'Hourly': 2080
 }
 
-# AI Costs
+# AI Costs - OCR, NLP and CV unit prices are the first tier of AI_PRICE_TIERS
 AI_COSTS = {
-    'ocr_per_page': 0.30,
-    'nlp_per_1k_tokens': 0.002,
-    'cv_per_image': 0.005,
     'ml_custom_model': 7500
 }
+
+# AI Volume Pricing - (monthly volume from, unit price) per tier.
+# Graduated: each unit is charged at the price of the tier it falls in.
+AI_PRICE_TIERS = {
+    'ocr': [(0, 0.30), (10000, 0.25), (100000, 0.15)],      # per page
+    'nlp': [(0, 0.002), (50000, 0.0015), (500000, 0.001)],  # per 1K tokens
+    'cv': [(0, 0.005), (100000, 0.004), (1000000, 0.0025)]  # per image
+}
+
+# AI Spend Projection
+AI_GROWTH = {
+    'monthly_growth_rate': 0.02,  # Volume growth per month
+    'projection_months': 12
+}
+
+# Dropdown Categories
+BUSINESS_AREAS = [
+    "Engineering",
+    "Finance",
+    "HR",
+    "Sales",
+    "Operations",
+    "IT",
+    "Customer Service"
+]
+
+PROJECT_CATEGORIES = [
+    "Data Processing",
+    "Report Generation",
+    "System Integration",
+    "Customer Service",
+    "Compliance"
+]
+
+PROJECT_STATUSES = [
+    "Idea",
+    "Assessment",
+    "In Queue",
+    "Development",
+    "Testing",
+    "Production"
+]
+
+# Automation Readiness answers (scale used by the readiness assessment)
+READINESS_ANSWERS = ["Strongly Disagree", "Disagree", "Neutral", "Agree", "Strongly Agree"]
+
+# Magic Quadrant - (high potential & easy, high potential & hard, low potential & easy, low & hard)
+QUADRANTS = ["🚀 Quick Win", "💎 Strategic", "🔧 Fill-in", "⏸️ Nice to Have"]
+
+# Portfolio Snapshots
+SNAPSHOT_SETTINGS = {
+    'directory': 'snapshots',
+    'checkpoint_interval': 12  # Store a full copy every N snapshots
+}
+
+# What-if Scenarios - named overrides of the values above.
+# 'config' keys are 'SECTION.key' (or 'SECTION.key.subkey' for nested values);
+# 'inputs' remap stored project inputs, e.g. {'environment': {old: new}}.
+SCENARIOS = {
+    'Offshore rates': {
+        'config': {
+            'TIMELINE_FACTORS.daily_rate_default': 450
+        }
+    },
+    'Citrix migration done': {
+        'inputs': {
+            'environment': {'Citrix/Virtual Environment': 'Web Applications'}
+        }
+    },
+    'Higher efficiency': {
+        'config': {
+            'FTE_CONSTANTS.automation_efficiency': 0.90
+        }
+    }
+}
+
+SCENARIO_FILE = "scenarios.json"  # User-defined scenarios, merged over SCENARIOS
+
+# Shared Components - effort reuse across projects that automate the same applications
+SHARED_COMPONENTS = {
+    'enabled': False,                   # Apply reuse discounts automatically on save
+    'connector_share_of_effort': 0.40,  # Share of effort spent on application connectors
+    'reuse_savings': 0.60,              # Share of connector effort saved when it already exists
+    'max_discount': 0.30                # Cap on the total_days discount per project
+}
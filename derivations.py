@@ -0,0 +1,293 @@
+"""
+Derivation graph for stored project columns
+Links each config constant and input column to the derived columns that
+depend on it, so only the affected columns are recomputed after a change
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+import config
+from calculations import AI_MODEL_COLUMN, AI_VOLUME_COLUMNS, READINESS_COLUMNS, RPACalculator
+
+# Config sections whose values are recorded in the config version
+CONFIG_SECTIONS = [
+    'COMPLEXITY_FACTORS',
+    'FTE_CONSTANTS',
+    'TIMELINE_FACTORS',
+    'FREQUENCY_MULTIPLIERS',
+    'AI_COSTS',
+    'AI_PRICE_TIERS',
+    'SHARED_COMPONENTS',
+]
+
+# Derived column -> (input/derived columns, config keys) it is computed from.
+# Listed in evaluation order. Rows saved before the readiness answers were
+# stored keep their automation_potential (see DerivedColumns).
+DERIVATIONS = {
+    'annual_volume': (['frequency', 'volume_per_freq'],
+                      ['FREQUENCY_MULTIPLIERS']),
+    'automation_potential': (READINESS_COLUMNS + ['annual_volume', 'data_type'], []),
+    'annual_hours': (['annual_volume', 'avg_handle_time'], []),
+    'fte_required': (['annual_hours'],
+                     ['FTE_CONSTANTS.productive_hours', 'FTE_CONSTANTS.shrinkage_factor']),
+    'fte_saved': (['fte_required'], ['FTE_CONSTANTS.automation_efficiency']),
+    'implementation_ease': (['app_count', 'logic_complexity', 'environment', 'data_type'], []),
+    'complexity_score': (['data_type', 'app_count', 'logic_complexity', 'environment'],
+                         ['COMPLEXITY_FACTORS.data', 'COMPLEXITY_FACTORS.applications',
+                          'COMPLEXITY_FACTORS.logic', 'COMPLEXITY_FACTORS.environment']),
+    'dev_days': (['process_steps', 'complexity_score'],
+                 ['TIMELINE_FACTORS.base_days_per_step']),
+    'total_days': (['dev_days', 'reuse_discount'],
+                   ['TIMELINE_FACTORS.testing_factor', 'TIMELINE_FACTORS.contingency_buffer']),
+    'implementation_cost': (['total_days'], ['TIMELINE_FACTORS.daily_rate_default']),
+    'annual_savings': (['fte_saved'],
+                       ['FTE_CONSTANTS.hourly_rate_default', 'FTE_CONSTANTS.annual_work_hours']),
+    'ai_monthly_cost': (['ai_ocr_pages', 'ai_nlp_tokens_k', 'ai_cv_images', 'ai_ml_model'],
+                        ['AI_PRICE_TIERS', 'AI_COSTS.ml_custom_model']),
+    'roi_percentage': (['implementation_cost', 'annual_savings', 'ai_monthly_cost'], []),
+    'payback_months': (['implementation_cost', 'annual_savings', 'ai_monthly_cost'], []),
+    'quadrant': (['automation_potential', 'implementation_ease'], []),
+    'priority_score': (['automation_potential', 'roi_percentage', 'implementation_ease', 'fte_saved'], []),
+}
+
+# Portfolio-level input -> config keys. Derived across all projects at once
+# (see shared_components.py), then feeds the per-row graph above.
+PORTFOLIO_DERIVATIONS = {
+    'reuse_discount': ['SHARED_COMPONENTS.connector_share_of_effort', 'SHARED_COMPONENTS.reuse_savings',
+                       'SHARED_COMPONENTS.max_discount'],
+}
+
+# Stored columns the derivation graph reads but never writes
+BASE_INPUTS = sorted({column for inputs, _ in DERIVATIONS.values() for column in inputs} - set(DERIVATIONS))
+
+
+def flatten_config(cfg=config):
+    """Flatten config sections into {'SECTION.key': value}"""
+    flat = {}
+    for section in CONFIG_SECTIONS:
+        values = getattr(cfg, section, {})
+        for key, value in values.items():
+            flat[f"{section}.{key}"] = value
+    # Round-trip through JSON so values compare equal to stored history
+    return json.loads(json.dumps(flat, sort_keys=True, default=str))
+
+
+def config_version(cfg=config):
+    """Short, stable fingerprint of the current config values"""
+    payload = json.dumps(flatten_config(cfg), sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:10]
+
+
+def changed_config_keys(old_flat, new_flat):
+    """Config keys whose value differs between two flattened configs"""
+    keys = set(old_flat) | set(new_flat)
+    return {key for key in keys if old_flat.get(key) != new_flat.get(key)}
+
+
+def _matches(config_key, dependency):
+    """True if a changed config key affects a declared dependency"""
+    return (config_key == dependency
+            or config_key.startswith(dependency + '.')
+            or dependency.startswith(config_key + '.'))
+
+
+def affected_columns(changed_config=(), changed_inputs=()):
+    """Derived columns to recompute, in evaluation order"""
+    dirty = set(changed_inputs)
+    affected = []
+    for column, (inputs, config_keys) in DERIVATIONS.items():
+        config_hit = any(_matches(key, dep) for key in changed_config for dep in config_keys)
+        if config_hit or dirty.intersection(inputs):
+            affected.append(column)
+            dirty.add(column)
+    return affected
+
+
+class DerivedColumns:
+    """One method per derived column, delegating to the RPACalculator formulas"""
+
+    def __init__(self, calculator=None):
+        self.calc = calculator or RPACalculator()
+        self.config = self.calc.config
+
+    def annual_volume(self, df):
+        return self.calc.calculate_annual_volume(df['frequency'], df['volume_per_freq'])
+
+    def automation_potential(self, df):
+        # Rows saved before readiness answers were stored keep their potential
+        answers = df[READINESS_COLUMNS]
+        potential = self.calc.calculate_automation_potential(
+            *(answers[column] for column in READINESS_COLUMNS), df['annual_volume'], df['data_type']
+        )
+        return potential.where(answers.notna().all(axis=1), df['automation_potential'])
+
+    def annual_hours(self, df):
+        return self.calc.calculate_annual_hours(df['annual_volume'], df['avg_handle_time'])
+
+    def fte_required(self, df):
+        return self.calc.calculate_fte_required(df['annual_hours'])
+
+    def fte_saved(self, df):
+        return self.calc.calculate_fte_saved(df['fte_required'])
+
+    def implementation_ease(self, df):
+        return self.calc.calculate_implementation_ease(
+            df['app_count'], df['logic_complexity'], df['environment'], df['data_type']
+        )
+
+    def complexity_score(self, df):
+        return self.calc.calculate_complexity_score(
+            df['data_type'], df['app_count'], df['logic_complexity'], df['environment']
+        )
+
+    def dev_days(self, df):
+        return self.calc.calculate_dev_days(df['process_steps'], df['complexity_score'])
+
+    def total_days(self, df):
+        # Portfolio-level connector reuse (see shared_components.py)
+        return self.calc.calculate_total_days(df['dev_days'], df['reuse_discount'].fillna(0))
+
+    def implementation_cost(self, df):
+        return self.calc.calculate_implementation_cost(df['total_days'])
+
+    def annual_savings(self, df):
+        return self.calc.calculate_annual_savings(df['fte_saved'])
+
+    def ai_monthly_cost(self, df):
+        # Rows saved before AI inputs were stored keep their flat monthly cost
+        inputs = df[list(AI_VOLUME_COLUMNS.values()) + [AI_MODEL_COLUMN]]
+        costs = self.calc.calculate_ai_costs(
+            *(inputs[column].to_numpy() for column in inputs.columns)
+        )['total'][:, 0]
+        return pd.Series(costs, index=df.index).where(inputs.notna().all(axis=1), df['ai_monthly_cost'])
+
+    def _roi(self, df):
+        return self.calc.calculate_roi(df['implementation_cost'], df['annual_savings'],
+                                       df['ai_monthly_cost'].fillna(0))
+
+    def roi_percentage(self, df):
+        return self._roi(df)[0]
+
+    def payback_months(self, df):
+        return self._roi(df)[1]
+
+    def quadrant(self, df):
+        return self.calc.determine_quadrant(df['automation_potential'], df['implementation_ease'])
+
+    def priority_score(self, df):
+        return self.calc.calculate_priority_score(
+            df['automation_potential'], df['roi_percentage'], df['implementation_ease'], df['fte_saved']
+        )
+
+
+def _assign_rows(result, mask, column, values):
+    """Write recomputed values into the masked rows, widening the column dtype if needed"""
+    if column not in result.columns:
+        result[column] = np.nan
+    # Whole-number columns read from Excel (e.g. annual_hours) cannot hold fractional
+    # results; pandas refuses the lossy setitem, so widen the column first
+    if pd.api.types.is_integer_dtype(result[column]) and not pd.api.types.is_integer_dtype(values):
+        result[column] = result[column].astype(float if pd.api.types.is_numeric_dtype(values) else object)
+    result.loc[mask, column] = values
+
+
+def changed_rows(before, after, columns=None):
+    """Rows whose values differ between two aligned frames (numbers compared with a tolerance)"""
+    columns = [column for column in (columns or after.columns) if column in after.columns]
+    changed = pd.Series(False, index=after.index)
+    for column in columns:
+        if column not in before.columns:
+            changed |= after[column].notna()
+            continue
+        old, new = before[column], after[column]
+        both_missing = old.isna() & new.isna()
+        if pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new):
+            same = pd.Series(np.isclose(old.astype(float), new.astype(float)), index=after.index)
+        else:
+            same = old.astype(object) == new.astype(object)
+        changed |= ~(same | both_missing)
+    return changed
+
+
+def recompute_derived(df, changed_config=(), changed_inputs=(), rows=None, calculator=None):
+    """
+    Recompute only the derived columns reached from the changed config keys
+    or input columns, for the selected rows (boolean mask; default all rows).
+    Returns a new DataFrame with the config version stamped on touched rows.
+    """
+    columns = affected_columns(changed_config, changed_inputs)
+    result = df.copy()
+    if result.empty:
+        return result
+
+    mask = pd.Series(True, index=result.index) if rows is None else pd.Series(rows, index=result.index)
+    if not mask.any():
+        return result
+
+    derived = DerivedColumns(calculator)
+    subset = result.loc[mask].copy()
+    for column in columns:
+        inputs, _ = DERIVATIONS[column]
+        if not set(inputs).issubset(subset.columns):
+            continue
+        subset[column] = getattr(derived, column)(subset)
+
+    for column in columns:
+        if column in subset.columns:
+            _assign_rows(result, mask, column, subset[column])
+    if 'config_version' not in result.columns:
+        result['config_version'] = None
+    result['config_version'] = result['config_version'].astype(object)
+    result.loc[mask, 'config_version'] = config_version(derived.config)
+    return result
+
+
+def refresh_stale_rows(df, config_history, calculator=None):
+    """
+    Bring rows computed under an older config up to date.
+    config_history maps version -> flattened config; rows with an unknown
+    version get every derived column recomputed.
+    """
+    if df.empty:
+        return df
+
+    calc = calculator or RPACalculator()
+    current_version = config_version(calc.config)
+    current_flat = flatten_config(calc.config)
+    versions = df['config_version'] if 'config_version' in df.columns else pd.Series(None, index=df.index)
+
+    all_changed = set()
+    for version in versions[versions != current_version].unique():
+        rows = (versions == version) if pd.notna(version) else versions.isna()
+        if version in config_history:
+            changed, inputs = changed_config_keys(config_history[version], current_flat), ()
+        else:
+            # Unknown or cleared version (e.g. a missing derived value): rebuild everything
+            changed, inputs = set(current_flat), BASE_INPUTS
+        df = recompute_derived(df, changed_config=changed, changed_inputs=inputs, rows=rows, calculator=calc)
+        all_changed |= changed
+    return refresh_reuse_discounts(df, all_changed, calc)
+
+
+def refresh_reuse_discounts(df, changed_config, calculator=None):
+    """
+    Re-derive reuse discounts after a change to the shared-component settings.
+    Only portfolios that use discounts (auto-applied, or applied from the
+    Project List) are touched; rows whose discount changes are recomputed.
+    """
+    dependencies = PORTFOLIO_DERIVATIONS['reuse_discount']
+    if df.empty or not any(_matches(key, dep) for key in changed_config for dep in dependencies):
+        return df
+
+    # shared_components builds on this module, so import it at call time
+    from shared_components import SharedComponentIndex, apply_reuse_discounts, discounts_active
+
+    calc = calculator or RPACalculator()
+    settings = calc.config.SHARED_COMPONENTS
+    if not discounts_active(df, settings):
+        return df
+    return apply_reuse_discounts(df, SharedComponentIndex.from_frame(df, settings), calc)
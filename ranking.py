@@ -0,0 +1,133 @@
+"""
+Ranking index for top-N, rank and percentile queries
+Keeps a sorted array per metric, for the whole portfolio and for each
+business area, so lookups are binary searches and edits touch one slot
+"""
+
+from bisect import bisect_left, bisect_right
+
+import pandas as pd
+
+RANKED_METRICS = ['priority_score', 'roi_percentage', 'annual_savings', 'fte_saved']
+
+PORTFOLIO = None  # Partition key for the whole portfolio
+
+
+class _SortedPartition:
+    """Values in ascending order, with project IDs kept alongside for ties and removal"""
+
+    def __init__(self, keys=None):
+        self.keys = keys or []                     # (value, project_id), ascending
+        self.values = [key[0] for key in self.keys]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def insert(self, value, project_id):
+        position = bisect_left(self.keys, (value, project_id))
+        self.keys.insert(position, (value, project_id))
+        self.values.insert(position, value)
+
+    def remove(self, value, project_id):
+        position = bisect_left(self.keys, (value, project_id))
+        if position < len(self.keys) and self.keys[position] == (value, project_id):
+            del self.keys[position]
+            del self.values[position]
+
+    def top(self, n):
+        """Highest n (value, project_id) pairs, best first"""
+        return self.keys[:-n - 1:-1] if n > 0 else []
+
+    def count_above(self, value):
+        return len(self.values) - bisect_right(self.values, value)
+
+    def count_at_or_below(self, value):
+        return bisect_right(self.values, value)
+
+
+class RankingIndex:
+    def __init__(self, metrics=None):
+        self.metrics = list(metrics or RANKED_METRICS)
+        self.partitions = {metric: {} for metric in self.metrics}
+        self.entries = {}  # project_id -> (business_area, {metric: value})
+
+    @classmethod
+    def from_frame(cls, df, metrics=None):
+        """Bulk-build the index with one sort per metric and partition"""
+        index = cls(metrics)
+        if df.empty:
+            return index
+
+        frame = df.drop_duplicates('project_id', keep='last')
+        for row in frame[['project_id', 'business_area'] + index.metrics].itertuples(index=False):
+            values = {metric: getattr(row, metric) for metric in index.metrics}
+            index.entries[row.project_id] = (row.business_area, values)
+
+        for metric in index.metrics:
+            ranked = frame[['project_id', 'business_area', metric]].dropna(subset=[metric])
+            ranked = ranked.sort_values([metric, 'project_id'])
+            keys = list(zip(ranked[metric].tolist(), ranked['project_id'].tolist()))
+            index.partitions[metric][PORTFOLIO] = _SortedPartition(keys)
+            for area, group in ranked.groupby('business_area', sort=False):
+                index.partitions[metric][area] = _SortedPartition(
+                    list(zip(group[metric].tolist(), group['project_id'].tolist()))
+                )
+        return index
+
+    def _partition(self, metric, area=PORTFOLIO):
+        return self.partitions[metric].setdefault(area, _SortedPartition())
+
+    # Updates
+
+    def upsert(self, project):
+        """Insert or update one project (dict or Series with project_id, business_area and metrics)"""
+        project_id = project['project_id']
+        self.remove(project_id)
+
+        area = project['business_area']
+        values = {metric: project[metric] for metric in self.metrics}
+        self.entries[project_id] = (area, values)
+        for metric, value in values.items():
+            if pd.isna(value):
+                continue
+            self._partition(metric).insert(value, project_id)
+            self._partition(metric, area).insert(value, project_id)
+
+    def upsert_frame(self, df):
+        """Incrementally apply a batch of inserted or edited rows"""
+        for _, project in df.iterrows():
+            self.upsert(project)
+
+    def remove(self, project_id):
+        if project_id not in self.entries:
+            return
+        area, values = self.entries.pop(project_id)
+        for metric, value in values.items():
+            if pd.isna(value):
+                continue
+            self._partition(metric).remove(value, project_id)
+            self._partition(metric, area).remove(value, project_id)
+
+    # Queries
+
+    def top_n(self, metric, n=10, area=PORTFOLIO):
+        """Project IDs of the n highest values, best first"""
+        return [project_id for _, project_id in self._partition(metric, area).top(n)]
+
+    def rank(self, metric, project_id, area=PORTFOLIO):
+        """1-based rank of a stored project (1 = highest); ties share a rank"""
+        value = self.entries[project_id][1][metric]
+        if pd.isna(value):
+            return None
+        return self._partition(metric, area).count_above(value) + 1
+
+    def percentile(self, metric, value, area=PORTFOLIO):
+        """Percent of projects whose value is at or below the given value"""
+        partition = self._partition(metric, area)
+        if pd.isna(value) or not len(partition):
+            return None
+        return partition.count_at_or_below(value) / len(partition) * 100
+
+    def project_percentile(self, metric, project_id, area=PORTFOLIO):
+        """Percentile of a stored project within the portfolio or an area"""
+        return self.percentile(metric, self.entries[project_id][1][metric], area)
@@ -0,0 +1,253 @@
+"""
+Offline report packs per business area
+Renders a self-contained HTML and XLSX report for each business area in
+parallel, from portfolio aggregates computed once up front
+
+Usage:
+    python reports.py [--input rpa_projects_database.xlsx] [--output reports] [--workers N]
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+
+import config
+from derivations import refresh_stale_rows
+from validation import ProjectValidator
+
+QUADRANT_COLORS = {
+    "🚀 Quick Win": "green",
+    "💎 Strategic": "blue",
+    "🔧 Fill-in": "orange",
+    "⏸️ Nice to Have": "gray"
+}
+
+TOP_COLUMNS = ['project_id', 'project_name', 'priority_score', 'roi_percentage', 'fte_saved',
+               'annual_savings', 'quadrant']
+
+PROJECT_COLUMNS = ['project_id', 'project_name', 'category', 'status', 'quadrant', 'automation_potential',
+                   'implementation_ease', 'fte_saved', 'annual_savings', 'implementation_cost',
+                   'ai_monthly_cost', 'roi_percentage', 'payback_months', 'priority_score']
+
+
+def precompute_aggregates(df):
+    """Portfolio-wide and per-area figures shared by every report"""
+    by_area = df.groupby('business_area').agg(
+        projects=('project_id', 'size'),
+        fte_saved=('fte_saved', 'sum'),
+        annual_savings=('annual_savings', 'sum'),
+        implementation_cost=('implementation_cost', 'sum'),
+        ai_monthly_cost=('ai_monthly_cost', 'sum'),
+        avg_roi=('roi_percentage', 'mean'),
+        avg_priority=('priority_score', 'mean'),
+    )
+    by_area['savings_rank'] = by_area['annual_savings'].rank(ascending=False, method='min').astype(int)
+
+    quadrants = pd.crosstab(df['business_area'], df['quadrant']).reindex(columns=config.QUADRANTS, fill_value=0)
+
+    return {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        'portfolio': {
+            'projects': len(df),
+            'annual_savings': float(df['annual_savings'].sum()),
+            'implementation_cost': float(df['implementation_cost'].sum()),
+            'fte_saved': float(df['fte_saved'].sum()),
+            'avg_roi': float(df['roi_percentage'].mean()),
+            'areas': len(by_area),
+        },
+        'by_area': by_area,
+        'quadrants': quadrants,
+    }
+
+
+def area_kpis(area, area_df, aggregates):
+    """Headline numbers for one business area"""
+    row = aggregates['by_area'].loc[area]
+    portfolio = aggregates['portfolio']
+    investment = row['implementation_cost']
+    return {
+        'Projects': int(row['projects']),
+        'FTE Saved': row['fte_saved'],
+        'Annual Savings': row['annual_savings'],
+        'Implementation Cost': investment,
+        'Annual AI Cost': row['ai_monthly_cost'] * 12,
+        'Average ROI (%)': row['avg_roi'],
+        'Area ROI (%)': (row['annual_savings'] - investment) / investment * 100 if investment > 0 else 0,
+        'Share of Portfolio Savings (%)': (row['annual_savings'] / portfolio['annual_savings'] * 100
+                                           if portfolio['annual_savings'] > 0 else 0),
+        'Savings Rank': f"{int(row['savings_rank'])} of {portfolio['areas']}",
+    }
+
+
+def _format_kpi(name, value):
+    if isinstance(value, str):
+        return value
+    if name in ('Annual Savings', 'Implementation Cost', 'Annual AI Cost'):
+        return f"${value:,.0f}"
+    if '%' in name:
+        return f"{value:.0f}%"
+    if name == 'Projects':
+        return f"{value:,}"
+    return f"{value:,.1f}"
+
+
+def _slug(area):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(area)).strip('_') or 'Unassigned'
+
+
+def render_html(area, area_df, kpis, aggregates, path):
+    """Self-contained HTML report (plotly.js is embedded)"""
+    fig = px.scatter(area_df, x='implementation_ease', y='automation_potential',
+                     color='quadrant', color_discrete_map=QUADRANT_COLORS,
+                     hover_name='project_name', render_mode='webgl',
+                     title=f"{area} - Magic Quadrant")
+    fig.add_hline(y=50, line_dash="dash", line_color="gray", opacity=0.5)
+    fig.add_vline(x=50, line_dash="dash", line_color="gray", opacity=0.5)
+    fig.update_layout(xaxis_title="Implementation Ease →", yaxis_title="Automation Potential →",
+                      xaxis=dict(range=[0, 100]), yaxis=dict(range=[0, 100]), height=600)
+
+    top = area_df.nlargest(10, 'priority_score')[TOP_COLUMNS]
+    financials = area_df.groupby('category').agg(
+        projects=('project_id', 'size'),
+        implementation_cost=('implementation_cost', 'sum'),
+        annual_savings=('annual_savings', 'sum'),
+        avg_roi=('roi_percentage', 'mean'),
+    ).reset_index()
+    quadrant_mix = aggregates['quadrants'].loc[[area]].T.rename(columns={area: 'projects'})
+
+    kpi_cells = "".join(
+        f"<div class='kpi'><div class='value'>{html.escape(_format_kpi(name, value))}</div>"
+        f"<div class='label'>{html.escape(name)}</div></div>"
+        for name, value in kpis.items()
+    )
+    money = '${:,.0f}'.format
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(str(area))} - RPA Report</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+.kpis {{ display: flex; flex-wrap: wrap; gap: 1em; }}
+.kpi {{ border: 1px solid #ddd; border-radius: 6px; padding: 0.8em 1.2em; min-width: 10em; }}
+.kpi .value {{ font-size: 1.4em; font-weight: bold; }}
+.kpi .label {{ color: #666; font-size: 0.9em; }}
+table {{ border-collapse: collapse; margin: 1em 0; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: right; }}
+th {{ background: #f4f4f4; }}
+</style></head><body>
+<h1>🤖 {html.escape(str(area))} - RPA Portfolio Report</h1>
+<p>Generated {aggregates['generated_at']}</p>
+<h2>Key Metrics</h2>
+<div class="kpis">{kpi_cells}</div>
+<h2>Magic Quadrant</h2>
+{fig.to_html(full_html=False, include_plotlyjs=True)}
+{quadrant_mix.to_html()}
+<h2>Top 10 Priority Projects</h2>
+{top.to_html(index=False, float_format='{:,.1f}'.format)}
+<h2>Financials by Category</h2>
+{financials.to_html(index=False, formatters={'implementation_cost': money, 'annual_savings': money,
+                                              'avg_roi': '{:.0f}%'.format})}
+</body></html>"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return path
+
+
+def render_xlsx(area, area_df, kpis, aggregates, path):
+    """XLSX report with a native quadrant chart"""
+    projects = area_df[PROJECT_COLUMNS].sort_values(['quadrant', 'priority_score'], ascending=[True, False])
+    top = area_df.nlargest(10, 'priority_score')[TOP_COLUMNS]
+    summary = pd.DataFrame({'Metric': list(kpis.keys()), 'Value': list(kpis.values())})
+
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        summary.to_excel(writer, sheet_name='Summary', index=False)
+        top.to_excel(writer, sheet_name='Top Priorities', index=False)
+        projects.to_excel(writer, sheet_name='Projects', index=False)
+        aggregates['quadrants'].loc[[area]].T.to_excel(writer, sheet_name='Summary', startcol=3)
+
+        workbook = writer.book
+        chart = workbook.add_chart({'type': 'scatter'})
+        x_col = PROJECT_COLUMNS.index('implementation_ease')
+        y_col = PROJECT_COLUMNS.index('automation_potential')
+        start = 1
+        for quadrant, count in projects['quadrant'].value_counts(sort=False).sort_index().items():
+            end = start + count - 1
+            chart.add_series({
+                'name': quadrant,
+                'categories': ['Projects', start, x_col, end, x_col],
+                'values': ['Projects', start, y_col, end, y_col],
+                'marker': {'type': 'circle', 'size': 5,
+                           'fill': {'color': QUADRANT_COLORS.get(quadrant, 'black')},
+                           'border': {'none': True}},
+            })
+            start = end + 1
+        chart.set_title({'name': f"{area} - Magic Quadrant"})
+        chart.set_x_axis({'name': 'Implementation Ease', 'min': 0, 'max': 100})
+        chart.set_y_axis({'name': 'Automation Potential', 'min': 0, 'max': 100})
+        chart.set_size({'width': 720, 'height': 520})
+        writer.sheets['Summary'].insert_chart('G2', chart)
+        writer.sheets['Summary'].set_column(0, 0, 30)
+    return path
+
+
+def render_area_report(area, area_df, aggregates, output_dir, formats):
+    """Worker: render every requested format for one business area"""
+    kpis = area_kpis(area, area_df, aggregates)
+    base = os.path.join(output_dir, f"rpa_report_{_slug(area)}")
+    paths = []
+    if 'html' in formats:
+        paths.append(render_html(area, area_df, kpis, aggregates, base + '.html'))
+    if 'xlsx' in formats:
+        paths.append(render_xlsx(area, area_df, kpis, aggregates, base + '.xlsx'))
+    return paths
+
+
+def generate_reports(df, output_dir='reports', formats=('html', 'xlsx'), max_workers=None):
+    """
+    Render one report pack per business area across a process pool.
+    Returns the list of written file paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if df.empty:
+        return []
+
+    aggregates = precompute_aggregates(df)
+    areas = df.groupby('business_area')
+    paths = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(render_area_report, area, area_df, aggregates, output_dir, formats)
+                   for area, area_df in areas]
+        for future in futures:
+            paths.extend(future.result())
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate RPA report packs per business area")
+    parser.add_argument('--input', default="rpa_projects_database.xlsx")
+    parser.add_argument('--output', default="reports")
+    parser.add_argument('--formats', default="html,xlsx")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    sheets = pd.read_excel(args.input, sheet_name=None)
+    history = {}
+    if 'config_history' in sheets:
+        history = {row.config_version: json.loads(row.config_values)
+                   for row in sheets['config_history'].itertuples()}
+    result = ProjectValidator().validate(sheets['projects'])
+    df = refresh_stale_rows(result['valid'], history)
+    if not result['quarantined'].empty:
+        print(f"⚠️ {len(result['quarantined'])} invalid row(s) left out of the reports")
+
+    paths = generate_reports(df, args.output, tuple(args.formats.split(',')), args.workers)
+    print(f"✅ Wrote {len(paths)} report file(s) to {args.output}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+What-if scenario manager
+Evaluates the portfolio under named overrides of config values (and of
+stored project inputs), concurrently, with results cached per scenario
+and data version
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import types
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import config
+from calculations import RPACalculator
+from derivations import CONFIG_SECTIONS, recompute_derived, refresh_reuse_discounts
+
+BASELINE = "Baseline"
+
+
+def data_version(df):
+    """Fingerprint of the portfolio contents"""
+    if df.empty:
+        return "empty"
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes() + ",".join(map(str, df.columns)).encode('utf-8')).hexdigest()[:12]
+
+
+class ScenarioManager:
+    def __init__(self, scenario_file=None, cache_size=32):
+        self.scenario_file = scenario_file or config.SCENARIO_FILE
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (scenario fingerprint, data version) -> DataFrame
+        self._lock = threading.Lock()
+
+    # Storage
+
+    def scenarios(self):
+        """Built-in scenarios from config, overlaid with saved user scenarios"""
+        scenarios = copy.deepcopy(config.SCENARIOS)
+        if os.path.exists(self.scenario_file):
+            with open(self.scenario_file, encoding='utf-8') as f:
+                scenarios.update(json.load(f))
+        # The baseline is the portfolio itself; a stored scenario must not shadow it
+        scenarios.pop(BASELINE, None)
+        return scenarios
+
+    def save_scenario(self, name, config_overrides=None, input_overrides=None):
+        """Store a user scenario in the scenario file"""
+        if name.strip().lower() == BASELINE.lower():
+            raise ValueError(f"'{BASELINE}' is reserved for the current portfolio")
+        saved = {}
+        if os.path.exists(self.scenario_file):
+            with open(self.scenario_file, encoding='utf-8') as f:
+                saved = json.load(f)
+        saved[name] = {'config': config_overrides or {}, 'inputs': input_overrides or {}}
+        with open(self.scenario_file, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2)
+
+    def delete_scenario(self, name):
+        if not os.path.exists(self.scenario_file):
+            return
+        with open(self.scenario_file, encoding='utf-8') as f:
+            saved = json.load(f)
+        saved.pop(name, None)
+        with open(self.scenario_file, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2)
+
+    # Evaluation
+
+    @staticmethod
+    def build_config(overrides):
+        """Copy of the config module with 'SECTION.key[.subkey]' overrides applied"""
+        scenario_config = types.SimpleNamespace(
+            **{section: copy.deepcopy(getattr(config, section)) for section in CONFIG_SECTIONS}
+        )
+        for path, value in overrides.items():
+            section, key, *subkey = path.split('.', 2)
+            target = getattr(scenario_config, section)
+            if subkey:
+                target = target[key]
+                key = subkey[0]
+                if key not in target and key.isdigit():
+                    key = int(key)  # e.g. COMPLEXITY_FACTORS.applications.6
+            if key not in target:
+                raise KeyError(f"Unknown config value '{path}'")
+            target[key] = value
+        return scenario_config
+
+    @staticmethod
+    def _fingerprint(scenario):
+        return hashlib.sha1(json.dumps(scenario, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+    def evaluate(self, df, scenario, version=None):
+        """Portfolio with derived columns recomputed under one scenario"""
+        key = (self._fingerprint(scenario), version or data_version(df))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        config_overrides = scenario.get('config', {})
+        input_overrides = scenario.get('inputs', {})
+
+        calc = RPACalculator()
+        calc.config = self.build_config(config_overrides)
+
+        scenario_df = df.copy()
+        changed_inputs = []
+        for column, mapping in input_overrides.items():
+            if column in scenario_df.columns:
+                scenario_df[column] = scenario_df[column].replace(mapping)
+                changed_inputs.append(column)
+
+        result = recompute_derived(scenario_df, changed_config=set(config_overrides),
+                                   changed_inputs=changed_inputs, calculator=calc)
+        result = refresh_reuse_discounts(result, set(config_overrides), calc)
+
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def evaluate_all(self, df, names=None, max_workers=None):
+        """Evaluate several scenarios concurrently; returns {name: DataFrame} incl. the baseline"""
+        scenarios = self.scenarios()
+        names = [name for name in (names or scenarios) if name in scenarios]
+        version = data_version(df)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {name: pool.submit(self.evaluate, df, scenarios[name], version) for name in names}
+            results = {name: future.result() for name, future in futures.items()}
+        return {BASELINE: df, **results}
+
+    # Comparison
+
+    @staticmethod
+    def portfolio_summary(results):
+        """Side-by-side portfolio metrics, one column per scenario"""
+        summary = {}
+        for name, df in results.items():
+            investment = df['implementation_cost'].sum()
+            savings = df['annual_savings'].sum()
+            quadrant_counts = df['quadrant'].value_counts()
+            summary[name] = {
+                'Implementation Cost': investment,
+                'Annual Savings': savings,
+                'FTE Saved': df['fte_saved'].sum(),
+                'Portfolio ROI (%)': (savings - investment) / investment * 100 if investment > 0 else 0,
+                'Average ROI (%)': df['roi_percentage'].mean(),
+                'Average Priority': df['priority_score'].mean(),
+                **{quadrant: int(quadrant_counts.get(quadrant, 0)) for quadrant in config.QUADRANTS}
+            }
+        return pd.DataFrame(summary)
+
+    @staticmethod
+    def project_diff(baseline, scenario):
+        """Per-project change in quadrant, ROI and priority versus the baseline"""
+        columns = ['project_id', 'project_name', 'quadrant', 'roi_percentage', 'priority_score']
+        merged = baseline[columns].merge(scenario[columns[:1] + columns[2:]], on='project_id',
+                                         suffixes=('_base', '_scenario'))
+        merged['roi_change'] = merged['roi_percentage_scenario'] - merged['roi_percentage_base']
+        merged['priority_change'] = merged['priority_score_scenario'] - merged['priority_score_base']
+        merged['quadrant_changed'] = merged['quadrant_base'] != merged['quadrant_scenario']
+        return merged
+
+    @staticmethod
+    def quadrant_moves(diff):
+        """Count of projects moving from each baseline quadrant to each scenario quadrant"""
+        return pd.crosstab(diff['quadrant_base'], diff['quadrant_scenario'])
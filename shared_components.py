@@ -0,0 +1,177 @@
+"""
+Shared-component effort model
+Clusters projects that automate the same applications (union-find over
+applications) and discounts effort for connectors another project builds
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+import config
+from derivations import recompute_derived
+from validation import PROJECT_ID_PATTERN
+
+APPLICATION_SEPARATOR = ";"
+
+
+def parse_applications(value):
+    """Normalized application names from a stored 'App A; App B' string"""
+    if not isinstance(value, str):
+        return []
+    names = [name.strip() for name in value.replace(',', APPLICATION_SEPARATOR).split(APPLICATION_SEPARATOR)]
+    return sorted({name for name in names if name})
+
+
+def format_applications(names):
+    """Stored form of a list of application names"""
+    return f"{APPLICATION_SEPARATOR} ".join(parse_applications(APPLICATION_SEPARATOR.join(names)))
+
+
+def _build_order(project_id):
+    """Sort key for who builds a connector: project number first (P2000 before P10000)"""
+    match = re.match(PROJECT_ID_PATTERN, str(project_id))
+    return (int(match.group(1)), '') if match else (float('inf'), str(project_id))
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:  # Path compression
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+class SharedComponentIndex:
+    """
+    Applications per project, clustered by overlap. The earliest project (by
+    project number) to touch an application builds its connector; later
+    projects reuse it. Inserts are incremental; edits and removals rebuild.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.SHARED_COMPONENTS
+        self.clusters = _UnionFind()
+        self.project_apps = {}  # project_id -> [application]
+        self.builders = {}      # application -> project_id that builds its connector
+
+    @classmethod
+    def from_frame(cls, df, settings=None):
+        index = cls(settings)
+        if df.empty or 'applications' not in df.columns:
+            return index
+        for project_id, applications in df[['project_id', 'applications']].itertuples(index=False):
+            index.add_project(project_id, applications)
+        return index
+
+    def add_project(self, project_id, applications):
+        """Register a project's applications and merge the clusters they connect"""
+        if isinstance(applications, (list, tuple, set)):
+            apps = sorted(set(applications))
+        else:
+            apps = parse_applications(applications)
+        self.project_apps[project_id] = apps
+        for app in apps:
+            self.clusters.add(app)
+            builder = self.builders.get(app)
+            if builder is None or _build_order(project_id) < _build_order(builder):
+                self.builders[app] = project_id
+            self.clusters.union(apps[0], app)
+
+    def cluster_of(self, project_id):
+        """Representative application of the project's cluster (None without applications)"""
+        apps = self.project_apps.get(project_id)
+        return self.clusters.find(apps[0]) if apps else None
+
+    def reused_share(self, project_id):
+        """Share of the project's applications whose connector another project builds"""
+        apps = self.project_apps.get(project_id) or []
+        if not apps:
+            return 0.0
+        reused = sum(1 for app in apps if self.builders[app] != project_id)
+        return reused / len(apps)
+
+    def discount(self, project_id):
+        """Fraction of total_days saved through connector reuse"""
+        settings = self.settings
+        discount = (self.reused_share(project_id) * settings['connector_share_of_effort']
+                    * settings['reuse_savings'])
+        return min(discount, settings['max_discount'])
+
+    def discounts(self, project_ids):
+        return pd.Series([self.discount(project_id) for project_id in project_ids], dtype=float)
+
+    def cluster_summary(self, df):
+        """One row per cluster of two or more projects: applications, projects and days saved"""
+        if df.empty:
+            return pd.DataFrame(columns=['cluster', 'applications', 'projects', 'days_saved'])
+        frame = df[['project_id', 'total_days']].copy()
+        frame['reuse_discount'] = df['reuse_discount'].fillna(0) if 'reuse_discount' in df else 0.0
+        frame['cluster'] = [self.cluster_of(project_id) for project_id in frame['project_id']]
+        frame = frame.dropna(subset=['cluster'])
+
+        # total_days is already discounted; recover the days saved from the standalone estimate
+        frame['days_saved'] = frame['total_days'] / (1 - frame['reuse_discount']) - frame['total_days']
+        apps = pd.Series(list(self.builders), dtype=object)
+        apps_by_cluster = apps.groupby(apps.map(self.clusters.find)).agg(lambda names: ", ".join(sorted(names)))
+
+        summary = frame.groupby('cluster').agg(projects=('project_id', 'size'), days_saved=('days_saved', 'sum'))
+        summary['applications'] = apps_by_cluster.reindex(summary.index)
+        summary = summary[summary['projects'] > 1].sort_values('days_saved', ascending=False)
+        return summary.reset_index()[['cluster', 'applications', 'projects', 'days_saved']]
+
+
+def discounts_active(df, settings=None):
+    """True when reuse discounts are in use: applied automatically, or applied from the Project List"""
+    settings = settings or config.SHARED_COMPONENTS
+    applied = 'reuse_discount' in df.columns and bool((df['reuse_discount'].fillna(0) > 0).any())
+    return settings['enabled'] or applied
+
+
+def apply_reuse_discounts(df, index=None, calculator=None, enabled=True, rows=None):
+    """
+    Set reuse_discount from the shared-component index and recompute
+    total_days, cost, ROI and priority for the rows whose discount changed.
+    rows limits the pass to a boolean mask (e.g. just-inserted projects);
+    with enabled=False every discount is cleared.
+    """
+    if df.empty:
+        return df
+    index = index or SharedComponentIndex.from_frame(df)
+    rows = np.ones(len(df), dtype=bool) if rows is None else np.asarray(rows, dtype=bool)
+
+    current = df['reuse_discount'].fillna(0).to_numpy() if 'reuse_discount' in df else np.zeros(len(df))
+    new = current.copy()
+    if enabled:
+        new[rows] = index.discounts(df.loc[rows, 'project_id']).to_numpy()
+    else:
+        new[rows] = 0.0
+    changed = ~np.isclose(new, current)
+    if not changed.any():
+        return df
+
+    result = df.copy()
+    result['reuse_discount'] = new
+    return recompute_derived(result, changed_inputs=['reuse_discount'], rows=changed, calculator=calculator)
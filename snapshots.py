@@ -0,0 +1,177 @@
+"""
+Portfolio snapshot history
+Each snapshot stores only the rows that changed since the previous one
+(plus a full checkpoint every few snapshots) as a Parquet file, and a
+manifest keeps the headline metrics of every snapshot for trend reports
+"""
+
+import os
+from datetime import datetime
+
+import pandas as pd
+
+import config
+
+MANIFEST_FILE = "manifest.csv"
+DELETED_FLAG = "_deleted"
+
+
+class SnapshotStore:
+    def __init__(self, directory=None, checkpoint_interval=None):
+        settings = config.SNAPSHOT_SETTINGS
+        self.directory = directory or settings['directory']
+        self.checkpoint_interval = checkpoint_interval or settings['checkpoint_interval']
+        self._latest = None  # Reconstructed state of the newest snapshot
+
+    # Manifest
+
+    def manifest(self):
+        """One row per snapshot with its kind, stored row count and metrics"""
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=['snapshot_id', 'taken_at', 'kind', 'rows_stored'])
+        manifest = pd.read_csv(path, parse_dates=['taken_at'])
+        return manifest.sort_values('snapshot_id').reset_index(drop=True)
+
+    def _write_manifest(self, manifest):
+        manifest.to_csv(os.path.join(self.directory, MANIFEST_FILE), index=False)
+
+    def _snapshot_path(self, snapshot_id, kind):
+        return os.path.join(self.directory, f"{snapshot_id:06d}_{kind}.parquet")
+
+    # Recording
+
+    def take_snapshot(self, df, taken_at=None):
+        """
+        Record the current portfolio. Returns the new snapshot_id, or None
+        when nothing changed since the previous snapshot.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = self.manifest()
+        current = self._normalize(df)
+
+        if manifest.empty:
+            snapshot_id, kind, stored = 1, 'full', current
+        else:
+            previous = self.latest()
+            changes = self.diff(previous, current)
+            if changes.empty:
+                return None
+            snapshot_id = int(manifest['snapshot_id'].max()) + 1
+            since_full = snapshot_id - int(manifest.loc[manifest['kind'] == 'full', 'snapshot_id'].max())
+            if since_full >= self.checkpoint_interval:
+                kind, stored = 'full', current
+            else:
+                kind, stored = 'delta', changes
+
+        stored.to_parquet(self._snapshot_path(snapshot_id, kind), index=False)
+
+        entry = {
+            'snapshot_id': snapshot_id,
+            'taken_at': pd.Timestamp(taken_at or datetime.now()),
+            'kind': kind,
+            'rows_stored': len(stored),
+            **self.summarize(current)
+        }
+        self._write_manifest(pd.concat([manifest, pd.DataFrame([entry])], ignore_index=True))
+        self._latest = (snapshot_id, current)
+        return snapshot_id
+
+    @staticmethod
+    def _normalize(df):
+        """Project rows keyed by project_id, with stable column types for Parquet"""
+        normalized = df.drop_duplicates('project_id', keep='last').set_index('project_id').sort_index()
+        for column in normalized.columns:
+            if normalized[column].dtype == object:
+                normalized[column] = normalized[column].astype('string')
+        return normalized.reset_index()
+
+    @staticmethod
+    def diff(previous, current):
+        """Rows added or changed in current, plus deletion markers for removed rows"""
+        prev = previous.set_index('project_id')
+        curr = current.set_index('project_id')
+        columns = curr.columns.union(prev.columns)
+        prev = prev.reindex(columns=columns)
+        curr = curr.reindex(columns=columns)
+
+        common = curr.index.intersection(prev.index)
+        a = curr.loc[common].astype(object)
+        b = prev.loc[common].astype(object)
+        changed_mask = (a.ne(b) & ~(a.isna() & b.isna())).any(axis=1)
+
+        changed = curr.loc[curr.index.difference(prev.index).union(common[changed_mask.to_numpy()])]
+        deleted = pd.DataFrame(index=prev.index.difference(curr.index), columns=columns)
+
+        delta = pd.concat([changed.assign(**{DELETED_FLAG: False}),
+                           deleted.assign(**{DELETED_FLAG: True})])
+        delta.index.name = 'project_id'
+        return delta.reset_index() if len(delta) else delta.iloc[0:0].reset_index()
+
+    # Reconstruction
+
+    def latest(self):
+        """Portfolio as of the newest snapshot"""
+        manifest = self.manifest()
+        if manifest.empty:
+            return pd.DataFrame()
+        newest = int(manifest['snapshot_id'].max())
+        if self._latest is None or self._latest[0] != newest:
+            self._latest = (newest, self.reconstruct(newest))
+        return self._latest[1]
+
+    def reconstruct(self, snapshot_id):
+        """Rebuild the portfolio at a snapshot from the nearest checkpoint and its deltas"""
+        manifest = self.manifest()
+        manifest = manifest[manifest['snapshot_id'] <= snapshot_id]
+        if manifest.empty:
+            return pd.DataFrame()
+
+        checkpoint = int(manifest.loc[manifest['kind'] == 'full', 'snapshot_id'].max())
+        state = pd.read_parquet(self._snapshot_path(checkpoint, 'full')).set_index('project_id')
+
+        for entry in manifest[manifest['snapshot_id'] > checkpoint].itertuples():
+            delta = pd.read_parquet(self._snapshot_path(entry.snapshot_id, 'delta')).set_index('project_id')
+            removed = delta.index[delta[DELETED_FLAG].astype(bool)]
+            upserts = delta[~delta[DELETED_FLAG].astype(bool)].drop(columns=DELETED_FLAG)
+            state = state.drop(index=removed.union(upserts.index), errors='ignore')
+            state = pd.concat([state, upserts.reindex(columns=state.columns.union(upserts.columns))])
+
+        return state.sort_index().reset_index()
+
+    def as_of(self, timestamp):
+        """Portfolio as it stood at a point in time (latest snapshot at or before it)"""
+        manifest = self.manifest()
+        eligible = manifest[manifest['taken_at'] <= pd.Timestamp(timestamp)]
+        if eligible.empty:
+            return pd.DataFrame()
+        return self.reconstruct(int(eligible['snapshot_id'].max()))
+
+    # Trends
+
+    @staticmethod
+    def summarize(df):
+        """Headline portfolio metrics stored with each snapshot"""
+        quadrant_counts = df['quadrant'].value_counts() if 'quadrant' in df else pd.Series(dtype=int)
+        summary = {
+            'project_count': len(df),
+            'annual_savings': float(df['annual_savings'].sum()) if 'annual_savings' in df else 0.0,
+            'fte_saved': float(df['fte_saved'].sum()) if 'fte_saved' in df else 0.0,
+            'implementation_cost': float(df['implementation_cost'].sum()) if 'implementation_cost' in df else 0.0,
+        }
+        for quadrant in config.QUADRANTS:
+            summary[quadrant] = int(quadrant_counts.get(quadrant, 0))
+        return summary
+
+    def monthly_trends(self):
+        """Metrics of the last snapshot in each month"""
+        manifest = self.manifest()
+        if manifest.empty:
+            return manifest
+        manifest['month'] = manifest['taken_at'].dt.to_period('M').dt.to_timestamp()
+        return manifest.groupby('month').last().reset_index()
+
+    def storage_rows(self):
+        """Total rows stored across all snapshot files"""
+        manifest = self.manifest()
+        return int(manifest['rows_stored'].sum()) if not manifest.empty else 0
@@ -0,0 +1,254 @@
+"""
+Schema validation and repair for the projects table
+Checks the whole frame in one vectorized pass, repairs what can be repaired
+and quarantines rows that cannot be used in calculations
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+from calculations import READINESS_COLUMNS
+
+# Column -> expected type and the value used to repair a missing entry.
+# A default of None means the value cannot be invented: rows missing it are
+# quarantined (inputs) or recomputed from the derivation graph (derived).
+TEXT_COLUMNS = {
+    'project_id': None,
+    'project_name': 'Unnamed Project',
+    'business_area': 'Unassigned',
+    'category': 'Unassigned',
+    'status': 'Idea',
+    'process_owner': '',
+    'description': '',
+    'frequency': None,
+    'quadrant': None,
+    'data_type': None,
+    'logic_complexity': None,
+    'environment': None,
+    'applications': '',
+    'created_date': '',
+}
+
+NUMERIC_COLUMNS = {
+    'current_fte': 0,
+    'volume_per_freq': None,
+    'annual_volume': None,
+    'avg_handle_time': None,
+    'annual_hours': None,
+    'fte_required': None,
+    'fte_saved': None,
+    'app_count': None,
+    'process_steps': None,
+    'automation_potential': None,
+    'implementation_ease': None,
+    'complexity_score': None,
+    'dev_days': None,
+    'total_days': None,
+    'implementation_cost': None,
+    'annual_savings': None,
+    'roi_percentage': None,
+    'payback_months': None,
+    'priority_score': None,
+    'ai_monthly_cost': 0,
+}
+
+# Optional inputs: coerced to numbers, but rows saved before they existed
+# keep them empty (the derivation graph falls back to the stored value,
+# or to no discount for reuse_discount)
+OPTIONAL_NUMERIC_COLUMNS = ['ai_ocr_pages', 'ai_nlp_tokens_k', 'ai_cv_images', 'ai_ml_model', 'reuse_discount']
+
+# Optional text inputs: rows saved before the readiness answers were stored
+# keep them empty (their automation_potential is kept as stored)
+OPTIONAL_TEXT_COLUMNS = READINESS_COLUMNS
+
+# Columns the derivation graph can rebuild from the inputs
+DERIVED_COLUMNS = [
+    'annual_volume', 'annual_hours', 'fte_required', 'fte_saved', 'implementation_ease',
+    'complexity_score', 'dev_days', 'total_days', 'implementation_cost', 'annual_savings',
+    'roi_percentage', 'payback_months', 'quadrant', 'priority_score'
+]
+
+# Column -> allowed values; 'quarantine' columns drive the calculations
+CATEGORY_RULES = {
+    'frequency': (list(config.FREQUENCY_MULTIPLIERS.keys()), 'quarantine'),
+    'data_type': (list(config.COMPLEXITY_FACTORS['data'].keys()), 'quarantine'),
+    'logic_complexity': (list(config.COMPLEXITY_FACTORS['logic'].keys()), 'quarantine'),
+    'environment': (list(config.COMPLEXITY_FACTORS['environment'].keys()), 'quarantine'),
+    'business_area': (config.BUSINESS_AREAS, 'repair'),
+    'category': (config.PROJECT_CATEGORIES, 'repair'),
+    'status': (config.PROJECT_STATUSES, 'repair'),
+    **{column: (config.READINESS_ANSWERS, 'quarantine') for column in READINESS_COLUMNS},
+}
+
+# Column -> (min, max, action); 'clip' repairs, 'quarantine' rejects the row,
+# 'recompute' rebuilds a derived value from the inputs on the next refresh
+RANGE_RULES = {
+    'volume_per_freq': (1, None, 'quarantine'),
+    'avg_handle_time': (1, None, 'quarantine'),
+    'app_count': (1, None, 'quarantine'),
+    'process_steps': (1, None, 'quarantine'),
+    'current_fte': (0, None, 'clip'),
+    'ai_monthly_cost': (0, None, 'clip'),
+    'ai_ocr_pages': (0, None, 'clip'),
+    'ai_nlp_tokens_k': (0, None, 'clip'),
+    'ai_cv_images': (0, None, 'clip'),
+    'reuse_discount': (0, 0.95, 'clip'),
+    'automation_potential': (0, 100, 'clip'),
+    'implementation_ease': (0, 100, 'recompute'),
+    'priority_score': (None, 100, 'recompute'),  # Negative ROI legitimately scores below 0
+}
+
+# PNNNN-style project IDs; the number orders projects by creation
+PROJECT_ID_PATTERN = r'^P(\d+)$'
+
+
+class ProjectValidator:
+    def __init__(self):
+        self.config = config
+
+    def validate(self, df):
+        """
+        Validate and repair a projects DataFrame.
+        Returns {'valid': DataFrame, 'quarantined': DataFrame, 'issues': DataFrame}
+        where issues lists one row per (project, column, problem, action).
+        """
+        df = df.copy().reset_index(drop=True)
+        issues = []
+        quarantine = pd.Series(False, index=df.index)
+        recompute = pd.Series(False, index=df.index)  # Derived values to rebuild on the next refresh
+
+        def record(mask, column, issue, action):
+            if mask.any():
+                found = pd.DataFrame({
+                    'row': df.index[mask] + 1,  # 1-based position in the loaded table
+                    'project_id': df.loc[mask, 'project_id'] if 'project_id' in df.columns else None,
+                    'column': column,
+                    'issue': issue,
+                    'action': action
+                })
+                issues.append(found)
+
+        # Required columns
+        added = set()
+        for column in list(TEXT_COLUMNS) + list(NUMERIC_COLUMNS):
+            if column not in df.columns:
+                df[column] = np.nan
+                added.add(column)
+                issues.append(pd.DataFrame([{
+                    'row': None, 'project_id': None, 'column': column,
+                    'issue': 'missing column', 'action': 'added'
+                }]))
+
+        for column in OPTIONAL_NUMERIC_COLUMNS + OPTIONAL_TEXT_COLUMNS:
+            if column not in df.columns:
+                df[column] = np.nan
+
+        # Dtypes
+        for column in list(NUMERIC_COLUMNS) + OPTIONAL_NUMERIC_COLUMNS:
+            coerced = pd.to_numeric(df[column], errors='coerce')
+            record(coerced.isna() & df[column].notna(), column, 'not a number', 'cleared')
+            df[column] = coerced
+        for column in list(TEXT_COLUMNS) + OPTIONAL_TEXT_COLUMNS:
+            text = df[column].astype(object)
+            df[column] = text.where(text.isna(), text.astype(str).str.strip())
+            df.loc[df[column] == '', column] = np.nan
+
+        # Missing values
+        for column, default in {**TEXT_COLUMNS, **NUMERIC_COLUMNS}.items():
+            missing = df[column].isna()
+            if column == 'project_id' or not missing.any():
+                continue
+            if default is not None:
+                # Blank optional fields and newly added columns are not worth a report line
+                if default != '' and column not in added:
+                    record(missing, column, 'missing value', f'set to {default!r}')
+                df[column] = df[column].where(~missing, default)
+            elif column in DERIVED_COLUMNS:
+                record(missing, column, 'missing value', 'recompute')
+            else:
+                record(missing, column, 'missing value', 'quarantined')
+                quarantine |= missing
+
+        # Category membership
+        for column, (allowed, action) in CATEGORY_RULES.items():
+            default = TEXT_COLUMNS.get(column)
+            invalid = df[column].notna() & ~df[column].isin(list(allowed) + [default])
+            if action == 'quarantine':
+                record(invalid, column, 'unknown category', 'quarantined')
+                quarantine |= invalid
+            else:
+                record(invalid, column, 'unknown category', f'set to {default!r}')
+                df[column] = df[column].where(~invalid, default)
+
+        # Derived labels outside the known set are rebuilt like missing values
+        invalid_quadrant = df['quadrant'].notna() & ~df['quadrant'].isin(config.QUADRANTS)
+        record(invalid_quadrant, 'quadrant', 'unknown category', 'recompute')
+        recompute |= invalid_quadrant
+
+        # Numeric ranges
+        for column, (low, high, action) in RANGE_RULES.items():
+            values = df[column]
+            out_of_range = pd.Series(False, index=df.index)
+            if low is not None:
+                out_of_range |= values < low
+            if high is not None:
+                out_of_range |= values > high
+            if action == 'clip':
+                record(out_of_range, column, 'out of range', 'clipped')
+                df[column] = values.clip(lower=low, upper=high)
+            elif action == 'recompute':
+                record(out_of_range, column, 'out of range', 'recompute')
+                recompute |= out_of_range
+            else:
+                record(out_of_range, column, 'out of range', 'quarantined')
+                quarantine |= out_of_range
+
+        # Missing or duplicate project IDs get fresh IDs
+        df['project_id'] = self._repair_project_ids(df, record)
+
+        # Rows with a missing or invalid derived value are recomputed on the next refresh
+        needs_recompute = (df[DERIVED_COLUMNS].isna().any(axis=1) | recompute) & ~quarantine
+        if 'config_version' not in df.columns:
+            df['config_version'] = None
+        df['config_version'] = df['config_version'].astype(object)
+        df.loc[needs_recompute, 'config_version'] = None
+
+        report = pd.concat(issues, ignore_index=True) if issues else pd.DataFrame(
+            columns=['row', 'project_id', 'column', 'issue', 'action']
+        )
+        return {
+            'valid': df[~quarantine].reset_index(drop=True),
+            'quarantined': df[quarantine].reset_index(drop=True),
+            'issues': report
+        }
+
+    def _repair_project_ids(self, df, record):
+        """Assign new PNNNN IDs to rows with a missing or duplicate project_id"""
+        ids = df['project_id']
+        missing = ids.isna()
+        duplicate = ids.duplicated(keep='first') & ~missing
+        record(missing, 'project_id', 'missing value', 'new id assigned')
+        record(duplicate, 'project_id', 'duplicate id', 'new id assigned')
+
+        to_assign = missing | duplicate
+        if not to_assign.any():
+            return ids
+
+        next_id = self.next_project_number(ids)
+        new_ids = [f"P{n:04d}" for n in range(next_id, next_id + int(to_assign.sum()))]
+        ids = ids.copy()
+        ids[to_assign] = new_ids
+        return ids
+
+    @staticmethod
+    def project_numbers(ids):
+        """Numeric part of PNNNN-style project IDs (NaN for other IDs)"""
+        return pd.to_numeric(pd.Series(ids, dtype=object).astype(str).str.extract(PROJECT_ID_PATTERN)[0],
+                             errors='coerce')
+
+    @staticmethod
+    def next_project_number(ids):
+        """Next free number for PNNNN-style project IDs"""
+        numbers = ProjectValidator.project_numbers(ids)
+        return int(numbers.max()) + 1 if numbers.notna().any() else 1